@@ -0,0 +1,94 @@
+"""
+Benchmark harness for the entailment checks in logic.py.
+
+Builds random knowledge bases over a number of symbols and asks each
+check whether they entail one of their own conjuncts, which holds and so
+makes model_check visit every model, and each symbol, which usually does
+not. The knowledge-base check answers all of a knowledge base's queries
+in one batch. Reports the time of each check and that they all agree.
+"""
+
+import argparse
+import random
+import time
+
+from logic import (And, Biconditional, Implication, KnowledgeBase, Not, Or,
+                   Symbol, compiled_check, model_check, parallel_check,
+                   sat_check)
+
+
+def batch(check):
+    """Returns a check of many queries that asks them one at a time."""
+    return lambda knowledge, queries: [
+        check(knowledge, query) for query in queries
+    ]
+
+
+# Every check the harness can run, each answering a list of queries
+CHECKS = {
+    "model_check": batch(model_check),
+    "compiled": batch(compiled_check),
+    "parallel": batch(parallel_check),
+    "sat": batch(sat_check),
+    "knowledge-base": lambda knowledge, queries: (
+        KnowledgeBase(knowledge).entails_all(queries)
+    )
+}
+
+
+def random_sentence(symbols, size, rng):
+    """Returns a random sentence with about size connectives."""
+    if size <= 0:
+        symbol = rng.choice(symbols)
+        return symbol if rng.random() < 0.5 else Not(symbol)
+    kind = rng.randrange(5)
+    if kind == 0:
+        return Not(random_sentence(symbols, size - 1, rng))
+    left = rng.randrange(size)
+    a = random_sentence(symbols, left, rng)
+    b = random_sentence(symbols, size - 1 - left, rng)
+    return [And, Or, Implication, Biconditional][kind - 1](a, b)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time the entailment checks on random formulas."
+    )
+    parser.add_argument("--symbols", type=int, default=14)
+    parser.add_argument("--conjuncts", type=int, default=8,
+                        help="sentences in each knowledge base")
+    parser.add_argument("--size", type=int, default=25,
+                        help="connectives in each sentence")
+    parser.add_argument("--trials", type=int, default=3)
+    parser.add_argument("--check", action="append", choices=list(CHECKS),
+                        help="check to run (default: all)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    names = args.check or list(CHECKS)
+
+    rng = random.Random(args.seed)
+    symbols = [Symbol(f"P{i}") for i in range(args.symbols)]
+    totals = {name: 0 for name in names}
+    for trial in range(args.trials):
+        knowledge = And(*[
+            random_sentence(symbols, args.size, rng)
+            for _ in range(args.conjuncts)
+        ])
+        queries = [rng.choice(knowledge.conjuncts)] + symbols
+        answers = {}
+        for name in names:
+            start = time.perf_counter()
+            answers[name] = tuple(CHECKS[name](knowledge, queries))
+            totals[name] += time.perf_counter() - start
+        if len(set(answers.values())) != 1:
+            raise Exception(f"checks disagree on trial {trial}: {answers}")
+
+    print(f"{(args.symbols + 1) * args.trials} queries over "
+          f"{args.symbols} symbols, "
+          f"{args.conjuncts} sentences of {args.size} connectives")
+    for name in names:
+        print(f"{name:<14}{totals[name]:>10.3f}s")
+
+
+if __name__ == "__main__":
+    main()
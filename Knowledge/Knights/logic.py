@@ -1,8 +1,25 @@
 import itertools
+import math
+import multiprocessing
+import os
+
+import sat
+
+# Positions of the properties a sentence caches, after the generation
+# they were computed in
+HASH, SYMBOLS, FORMULA = 1, 2, 3
 
 
 class Sentence():
 
+    # Bumped whenever a sentence inside another one changes, invalidating
+    # every cache
+    generation = 0
+
+    # Generation and cached properties, in one attribute since each
+    # attribute set after __init__ costs memory in every instance
+    _cache = None
+
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
@@ -15,11 +32,51 @@ class Sentence():
         """Returns a set of all symbols in the logical sentence."""
         return set()
 
+    def cached(self, index, compute):
+        """
+        Returns a cached property of the sentence, calling compute only
+        the first time it is asked for since any sentence last changed.
+        """
+        cache = self._cache
+        if cache is None or cache[0] != Sentence.generation:
+            cache = self._cache = [Sentence.generation, None, None, None]
+        if cache[index] is None:
+            cache[index] = compute()
+        return cache[index]
+
+    def __getstate__(self):
+        """Pickles the sentence without its cache, which is per process."""
+        return {key: value for key, value in self.__dict__.items()
+                if key != "_cache"}
+
+    @property
+    def is_interned(self):
+        """Whether the sentence is the shared copy made by intern."""
+        return interned.get(self) is self
+
+    def compile(self, symbols=None):
+        """
+        Returns the sentence compiled to a Program, which evaluates it
+        over many models at once. Symbols fixes the order of the inputs.
+        """
+        return Program(self, symbols)
+
     @classmethod
     def validate(cls, sentence):
         if not isinstance(sentence, Sentence):
             raise TypeError("must be a logical sentence")
 
+    @classmethod
+    def operand(cls, sentence):
+        """
+        Validates a sentence becoming part of another one, and returns it.
+        A conjunction is marked, since adding to it changes its container.
+        """
+        cls.validate(sentence)
+        if isinstance(sentence, And):
+            sentence.contained = True
+        return sentence
+
     @classmethod
     def parenthesize(cls, s):
         """Parenthesizes an expression if not already parenthesized."""
@@ -71,14 +128,14 @@ class Symbol(Sentence):
 
 class Not(Sentence):
     def __init__(self, operand):
-        Sentence.validate(operand)
-        self.operand = operand
+        self.operand = Sentence.operand(operand)
 
     def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+        return self is other or (isinstance(other, Not)
+                                 and self.operand == other.operand)
 
     def __hash__(self):
-        return hash(("not", hash(self.operand)))
+        return self.cached(HASH, lambda: hash(("not", hash(self.operand))))
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -87,25 +144,33 @@ class Not(Sentence):
         return not self.operand.evaluate(model)
 
     def formula(self):
-        return "¬" + Sentence.parenthesize(self.operand.formula())
+        return self.cached(FORMULA, lambda: (
+            "¬" + Sentence.parenthesize(self.operand.formula())
+        ))
 
     def symbols(self):
-        return self.operand.symbols()
+        return set(self.cached(SYMBOLS, lambda: frozenset(
+            self.operand.symbols()
+        )))
 
 
 class And(Sentence):
+
+    # Whether the conjunction is part of another sentence
+    contained = False
+
     def __init__(self, *conjuncts):
-        for conjunct in conjuncts:
-            Sentence.validate(conjunct)
-        self.conjuncts = list(conjuncts)
+        self.conjuncts = tuple(Sentence.operand(conjunct)
+                               for conjunct in conjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+        return self is other or (isinstance(other, And)
+                                 and self.conjuncts == other.conjuncts)
 
     def __hash__(self):
-        return hash(
+        return self.cached(HASH, lambda: hash(
             ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
-        )
+        ))
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -115,7 +180,16 @@ class And(Sentence):
 
     def add(self, conjunct):
         Sentence.validate(conjunct)
-        self.conjuncts.append(conjunct)
+        # Interned sentences were hashed on the way in, so ones never
+        # hashed need no lookup
+        if self._cache is not None and self.is_interned:
+            raise Exception("cannot add to an interned sentence")
+        self.conjuncts += (Sentence.operand(conjunct),)
+        self._cache = None
+
+        # Sentences containing this one may have cached what it was
+        if self.contained:
+            Sentence.generation += 1
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
@@ -123,26 +197,30 @@ class And(Sentence):
     def formula(self):
         if len(self.conjuncts) == 1:
             return self.conjuncts[0].formula()
-        return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
-                           for conjunct in self.conjuncts])
+        return self.cached(FORMULA, lambda: " ∧ ".join(
+            [Sentence.parenthesize(conjunct.formula())
+             for conjunct in self.conjuncts]
+        ))
 
     def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+        return set(self.cached(SYMBOLS, lambda: frozenset().union(
+            *[conjunct.symbols() for conjunct in self.conjuncts]
+        )))
 
 
 class Or(Sentence):
     def __init__(self, *disjuncts):
-        for disjunct in disjuncts:
-            Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
+        self.disjuncts = tuple(Sentence.operand(disjunct)
+                               for disjunct in disjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+        return self is other or (isinstance(other, Or)
+                                 and self.disjuncts == other.disjuncts)
 
     def __hash__(self):
-        return hash(
+        return self.cached(HASH, lambda: hash(
             ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
-        )
+        ))
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
@@ -154,27 +232,31 @@ class Or(Sentence):
     def formula(self):
         if len(self.disjuncts) == 1:
             return self.disjuncts[0].formula()
-        return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
-                            for disjunct in self.disjuncts])
+        return self.cached(FORMULA, lambda: " ∨  ".join(
+            [Sentence.parenthesize(disjunct.formula())
+             for disjunct in self.disjuncts]
+        ))
 
     def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+        return set(self.cached(SYMBOLS, lambda: frozenset().union(
+            *[disjunct.symbols() for disjunct in self.disjuncts]
+        )))
 
 
 class Implication(Sentence):
     def __init__(self, antecedent, consequent):
-        Sentence.validate(antecedent)
-        Sentence.validate(consequent)
-        self.antecedent = antecedent
-        self.consequent = consequent
+        self.antecedent = Sentence.operand(antecedent)
+        self.consequent = Sentence.operand(consequent)
 
     def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+        return self is other or (isinstance(other, Implication)
+                                 and self.antecedent == other.antecedent
+                                 and self.consequent == other.consequent)
 
     def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+        return self.cached(HASH, lambda: hash(
+            ("implies", hash(self.antecedent), hash(self.consequent))
+        ))
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -184,28 +266,33 @@ class Implication(Sentence):
                 or self.consequent.evaluate(model))
 
     def formula(self):
-        antecedent = Sentence.parenthesize(self.antecedent.formula())
-        consequent = Sentence.parenthesize(self.consequent.formula())
-        return f"{antecedent} => {consequent}"
+        def compute():
+            antecedent = Sentence.parenthesize(self.antecedent.formula())
+            consequent = Sentence.parenthesize(self.consequent.formula())
+            return f"{antecedent} => {consequent}"
+        return self.cached(FORMULA, compute)
 
     def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+        return set(self.cached(SYMBOLS, lambda: frozenset.union(
+            frozenset(self.antecedent.symbols()),
+            self.consequent.symbols()
+        )))
 
 
 class Biconditional(Sentence):
     def __init__(self, left, right):
-        Sentence.validate(left)
-        Sentence.validate(right)
-        self.left = left
-        self.right = right
+        self.left = Sentence.operand(left)
+        self.right = Sentence.operand(right)
 
     def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
+        return self is other or (isinstance(other, Biconditional)
+                                 and self.left == other.left
+                                 and self.right == other.right)
 
     def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+        return self.cached(HASH, lambda: hash(
+            ("biconditional", hash(self.left), hash(self.right))
+        ))
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
@@ -217,47 +304,485 @@ class Biconditional(Sentence):
                     and not self.right.evaluate(model)))
 
     def formula(self):
-        left = Sentence.parenthesize(str(self.left))
-        right = Sentence.parenthesize(str(self.right))
-        return f"{left} <=> {right}"
+        def compute():
+            left = Sentence.parenthesize(str(self.left))
+            right = Sentence.parenthesize(str(self.right))
+            return f"{left} <=> {right}"
+        return self.cached(FORMULA, compute)
 
     def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
-
-
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
-
-    def check_all(knowledge, query, symbols, model):
-        """Checks if knowledge base entails query, given a particular model."""
-
-        # If model has an assignment for each symbol
-        if not symbols:
-
-            # If knowledge base is true in model, then query must also be true
-            if knowledge.evaluate(model):
-                return query.evaluate(model)
-            return True
+        return set(self.cached(SYMBOLS, lambda: frozenset.union(
+            frozenset(self.left.symbols()), self.right.symbols()
+        )))
+
+
+# Shared copy of every interned sentence, kept until cleared
+interned = dict()
+
+
+def intern(sentence):
+    """
+    Returns the shared copy of a sentence. Structurally equal sentences
+    intern to the same object, whose parts are interned too, so a
+    subsentence repeated across a knowledge base is stored once and
+    compared by identity. Interned sentences cannot be added to.
+    """
+    if sentence.is_interned:
+        return sentence
+    if isinstance(sentence, Symbol):
+        # Symbols never change, so the sentence itself can be shared
+        node = sentence
+    elif isinstance(sentence, Not):
+        node = Not(intern(sentence.operand))
+    elif isinstance(sentence, And):
+        node = And(*[intern(conjunct) for conjunct in sentence.conjuncts])
+    elif isinstance(sentence, Or):
+        node = Or(*[intern(disjunct) for disjunct in sentence.disjuncts])
+    elif isinstance(sentence, Implication):
+        node = Implication(intern(sentence.antecedent),
+                           intern(sentence.consequent))
+    elif isinstance(sentence, Biconditional):
+        node = Biconditional(intern(sentence.left), intern(sentence.right))
+    else:
+        raise TypeError(f"cannot intern {sentence!r}")
+
+    # Parts are shared, so looking the node up compares them by identity
+    return interned.setdefault(node, node)
+
+
+class KnowledgeBase():
+    """
+    Sentences known to be true, kept as clauses in one SAT solver for
+    the life of the knowledge base. Sentences can be added at any time,
+    and the clauses the solver learns answering one query carry over to
+    the next.
+    """
+
+    def __init__(self, *sentences):
+        self.sentences = []
+        self.cnf = CNF()
+        self.solver = sat.Solver()
+        for sentence in sentences:
+            self.add(sentence)
+
+    def add(self, sentence):
+        """Adds a sentence to the knowledge base."""
+        Sentence.validate(sentence)
+        self.sentences.append(sentence)
+        self.cnf.add(sentence)
+        self.flush()
+
+    def literal(self, query):
+        """Returns the solver literal of a query, defining it if needed."""
+        Sentence.validate(query)
+        literal = self.cnf.literal(query)
+        self.flush()
+        return literal
+
+    def flush(self):
+        """Hands the variables and clauses encoded so far to the solver."""
+        self.solver.reserve(self.cnf.count)
+        for clause in self.cnf.clauses:
+            self.solver.add_clause(clause)
+        self.cnf.clauses.clear()
+
+    def entails(self, query):
+        """
+        Checks if the knowledge base entails query, by assuming the
+        query false and asking the solver for a model.
+        """
+        return not self.solver.solve([-self.literal(query)])
+
+    def entails_all(self, queries):
+        """
+        Checks which of many queries the knowledge base entails. Returns
+        a list of booleans in the order of the queries.
+
+        Every model the solver finds while refuting one query is a
+        counter-model for any other query false in it, so most queries
+        that are not entailed are settled without a search of their own.
+        """
+        literals = [self.literal(query) for query in queries]
+        models = []
+        if self.solver.solve():
+            models.append(self.solver.model)
         else:
+            # Nothing is consistent with the knowledge, so it entails all
+            return [True] * len(literals)
 
-            # Choose one of the remaining unused symbols
-            remaining = symbols.copy()
-            p = remaining.pop()
+        def refuted(literal, model):
+            return model[abs(literal)] != (literal > 0)
 
-            # Create a model where the symbol is true
-            model_true = model.copy()
-            model_true[p] = True
+        answers = []
+        for literal in literals:
+            if any(refuted(literal, model) for model in models):
+                answers.append(False)
+            elif self.solver.solve([-literal]):
+                models.append(self.solver.model)
+                answers.append(False)
+            else:
+                answers.append(True)
+        return answers
 
-            # Create a model where the symbol is false
-            model_false = model.copy()
-            model_false[p] = False
 
-            # Ensure entailment holds in both models
-            return (check_all(knowledge, query, remaining, model_true) and
-                    check_all(knowledge, query, remaining, model_false))
+def model_check(knowledge, query):
+    """Checks if knowledge base entails query."""
 
     # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
+    symbols = list(set.union(knowledge.symbols(), query.symbols()))
+
+    # Visit every model in turn, without recursion, so the number of
+    # symbols is bounded only by time
+    for values in itertools.product([True, False], repeat=len(symbols)):
+        model = dict(zip(symbols, values))
+
+        # If knowledge base is true in model, then query must also be true
+        if knowledge.evaluate(model) and not query.evaluate(model):
+            return False
+    return True
+
+
+class Program():
+    """
+    A sentence compiled to a flat list of instructions over registers.
+
+    Registers 0 to n - 1 hold the symbols, in the order of
+    self.symbols, and each instruction computes one more register from
+    earlier ones with bitwise operations on integers. Bit j of every
+    register is the value in model j, so one pass evaluates as many
+    models as the integers have bits; a subsentence that appears more
+    than once is computed only once.
+    """
+
+    NOT, AND, OR, IMPLIES, IFF = range(5)
+
+    def __init__(self, sentence, symbols=None):
+        self.symbols = list(symbols) if symbols is not None else []
+        self.registers = {name: i for i, name in enumerate(self.symbols)}
+        self.code = []
+        output = self.emit(sentence)
+        del self.registers
+
+        # Instruction results were numbered ~0, ~1, ... while symbols
+        # were still being found; they follow the symbols' registers
+        n = len(self.symbols)
+
+        def relocate(register):
+            return register if register >= 0 else n + ~register
+        self.code = [(op, tuple(relocate(arg) for arg in args))
+                     for op, args in self.code]
+        self.output = relocate(output)
+
+    def emit(self, sentence):
+        """Returns the register holding a sentence, compiling it first."""
+        if isinstance(sentence, Symbol):
+            if sentence.name not in self.registers:
+                self.registers[sentence.name] = len(self.symbols)
+                self.symbols.append(sentence.name)
+            return self.registers[sentence.name]
+        if sentence in self.registers:
+            return self.registers[sentence]
+
+        if isinstance(sentence, Not):
+            instruction = (Program.NOT, (self.emit(sentence.operand),))
+        elif isinstance(sentence, And):
+            instruction = (Program.AND, tuple(
+                self.emit(conjunct) for conjunct in sentence.conjuncts
+            ))
+        elif isinstance(sentence, Or):
+            instruction = (Program.OR, tuple(
+                self.emit(disjunct) for disjunct in sentence.disjuncts
+            ))
+        elif isinstance(sentence, Implication):
+            instruction = (Program.IMPLIES, (self.emit(sentence.antecedent),
+                                             self.emit(sentence.consequent)))
+        elif isinstance(sentence, Biconditional):
+            instruction = (Program.IFF, (self.emit(sentence.left),
+                                         self.emit(sentence.right)))
+        else:
+            raise TypeError(f"cannot compile {sentence!r}")
+        self.code.append(instruction)
+        register = ~(len(self.code) - 1)
+        self.registers[sentence] = register
+        return register
+
+    def run(self, inputs, mask):
+        """
+        Evaluates the program on one integer per symbol, each holding
+        the symbol's value in many models, one bit per model. Mask has a
+        bit set for every model. Returns the integer of the sentence's
+        values.
+        """
+        registers = list(inputs)
+        for op, args in self.code:
+            if op == Program.NOT:
+                value = mask ^ registers[args[0]]
+            elif op == Program.AND:
+                value = mask
+                for arg in args:
+                    value &= registers[arg]
+            elif op == Program.OR:
+                value = 0
+                for arg in args:
+                    value |= registers[arg]
+            elif op == Program.IMPLIES:
+                value = (mask ^ registers[args[0]]) | registers[args[1]]
+            else:
+                value = mask ^ registers[args[0]] ^ registers[args[1]]
+            registers.append(value)
+        return registers[self.output]
 
-    # Check that knowledge entails query
-    return check_all(knowledge, query, symbols, dict())
+    def evaluate(self, model):
+        """Evaluates the program in one model, like Sentence.evaluate."""
+        inputs = []
+        for name in self.symbols:
+            try:
+                inputs.append(1 if model[name] else 0)
+            except KeyError:
+                raise Exception(f"variable {name} not in model")
+        return bool(self.run(inputs, 1))
+
+    def batches(self, width=16):
+        """Returns how many batches of 2 ** width models there are."""
+        return 2 ** max(len(self.symbols) - width, 0)
+
+    def models(self, width=16, start=0, stop=None):
+        """
+        Yields (inputs, mask) for every model of the program's symbols,
+        2 ** width models at a time. The first width symbols take every
+        combination of values within a batch, and the rest are fixed
+        per batch, by the bits of its number; start and stop pick a
+        range of batches.
+        """
+        n = len(self.symbols)
+        low = min(n, width)
+        size = 2 ** low
+        mask = (1 << size) - 1
+        columns = []
+        for i in range(low):
+            # 2 ** i zeros then 2 ** i ones, repeated across the batch
+            block = 2 ** (i + 1)
+            columns.append(
+                (((1 << 2 ** i) - 1) << 2 ** i)
+                * (mask // ((1 << block) - 1))
+            )
+        if stop is None:
+            stop = 2 ** (n - low)
+        for high in range(start, stop):
+            yield columns + [
+                mask if high >> k & 1 else 0 for k in range(n - low)
+            ], mask
+
+
+class CNF():
+    """
+    Tseitin encoding of sentences as clauses over integer variables.
+
+    Every symbol gets a variable, and so does every compound subsentence,
+    with clauses making it equal to its parts. The clauses grow linearly
+    with the sentences instead of exponentially, and a subsentence that
+    appears more than once is defined only once.
+    """
+
+    def __init__(self):
+        self.variables = dict()
+        self.definitions = dict()
+        self.clauses = []
+        self.count = 0
+
+    def variable(self):
+        """Returns a new variable."""
+        self.count += 1
+        return self.count
+
+    def literal(self, sentence):
+        """Returns a literal that is true exactly when a sentence is."""
+        if isinstance(sentence, Symbol):
+            if sentence.name not in self.variables:
+                self.variables[sentence.name] = self.variable()
+            return self.variables[sentence.name]
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if sentence in self.definitions:
+            return self.definitions[sentence]
+
+        if isinstance(sentence, And):
+            parts = [self.literal(conjunct) for conjunct in sentence.conjuncts]
+            x = self.variable()
+            for part in parts:
+                self.clauses.append([-x, part])
+            self.clauses.append([x] + [-part for part in parts])
+        elif isinstance(sentence, Or):
+            parts = [self.literal(disjunct) for disjunct in sentence.disjuncts]
+            x = self.variable()
+            for part in parts:
+                self.clauses.append([x, -part])
+            self.clauses.append([-x] + parts)
+        elif isinstance(sentence, Implication):
+            a = self.literal(sentence.antecedent)
+            b = self.literal(sentence.consequent)
+            x = self.variable()
+            self.clauses += [[-x, -a, b], [x, a], [x, -b]]
+        elif isinstance(sentence, Biconditional):
+            a = self.literal(sentence.left)
+            b = self.literal(sentence.right)
+            x = self.variable()
+            self.clauses += [[-x, -a, b], [-x, a, -b],
+                             [x, a, b], [x, -a, -b]]
+        else:
+            raise TypeError(f"cannot encode {sentence!r}")
+        self.definitions[sentence] = x
+        return x
+
+    def add(self, sentence):
+        """
+        Adds clauses requiring a sentence to be true. Top-level
+        conjunctions, disjunctions and implications become clauses
+        directly rather than through a defined variable.
+        """
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.clauses.append(
+                [self.literal(disjunct) for disjunct in sentence.disjuncts]
+            )
+        elif isinstance(sentence, Implication):
+            self.clauses.append([-self.literal(sentence.antecedent),
+                                 self.literal(sentence.consequent)])
+        else:
+            self.clauses.append([self.literal(sentence)])
+
+
+def sat_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, by asking a SAT solver
+    whether the knowledge base and the negated query can both hold.
+    Agrees with model_check, without enumerating every model.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+    cnf.add(Not(query))
+    solver = sat.Solver()
+    for clause in cnf.clauses:
+        if not solver.add_clause(clause):
+            return True
+    return not solver.solve()
+
+
+def compiled_check(knowledge, query, width=16):
+    """
+    Checks if knowledge base entails query, like model_check, by
+    evaluating a compiled program over 2 ** width models at a time.
+    """
+    program = And(knowledge, Not(query)).compile()
+    for inputs, mask in program.models(width):
+        if program.run(inputs, mask):
+            return False
+    return True
+
+
+# Chunks of batches per pool worker, so uneven chunks even out
+CHUNKS_PER_PROCESS = 4
+
+# Set up in each pool worker by init_worker
+worker_program = None
+worker_width = None
+found = None
+
+
+def init_worker(program, width, event):
+    """Sets up a pool worker for model enumeration."""
+    global worker_program, worker_width, found
+    worker_program = program
+    worker_width = width
+    found = event
+
+
+def count_batches(program, width, start, stop, first, event):
+    """
+    Returns how many models in a range of batches make a program true.
+    If first, stops at the first batch with one, or as soon as the event
+    shows another worker has found one.
+    """
+    count = 0
+    for inputs, mask in program.models(width, start, stop):
+        if first and event is not None and event.is_set():
+            break
+        value = program.run(inputs, mask)
+        if value:
+            count += value.bit_count()
+            if first:
+                if event is not None:
+                    event.set()
+                break
+    return count
+
+
+def count_chunk(task):
+    """Counts the models of one chunk of batches in a pool worker."""
+    start, stop, first = task
+    return count_batches(worker_program, worker_width, start, stop, first,
+                         found)
+
+
+def count_models(sentence, symbols=None, processes=None, width=16,
+                 first=False):
+    """
+    Returns how many models of its symbols make a sentence true (#SAT).
+    Symbols fixes the symbols counted over, which may include ones the
+    sentence does not mention. If first, the count is only good for
+    telling zero from more, and the enumeration stops as soon as one
+    model is found.
+
+    Models are enumerated in batches of 2 ** width, one bit per model,
+    by a compiled program. The batches are split by the values of the
+    last few symbols into chunks for a process pool.
+    """
+    program = sentence.compile(symbols)
+    batches = program.batches(width)
+    if processes == 1 or batches == 1:
+        return count_batches(program, width, 0, batches, first, None)
+
+    # Fixes enough symbols to give every worker a few chunks
+    processes = processes or os.cpu_count() or 1
+    prefix_bits = math.ceil(math.log2(processes * CHUNKS_PER_PROCESS))
+    chunks = min(batches, 2 ** prefix_bits)
+    size = batches // chunks
+    tasks = [(k * size, (k + 1) * size, first) for k in range(chunks)]
+
+    event = multiprocessing.Event()
+    count = 0
+    with multiprocessing.Pool(processes, init_worker,
+                              (program, width, event)) as pool:
+        for chunk in pool.imap_unordered(count_chunk, tasks):
+            count += chunk
+            if first and count:
+                break
+    return count
+
+
+def parallel_check(knowledge, query, processes=None, width=16):
+    """
+    Checks if knowledge base entails query, like model_check, by
+    looking for a counter-model across a process pool and stopping at
+    the first one.
+    """
+    return not count_models(And(knowledge, Not(query)),
+                            processes=processes, width=width, first=True)
+
+
+def probability(query, knowledge=None, processes=None, width=16):
+    """
+    Returns the fraction of the models of a knowledge base in which
+    query is true, every model counting the same, from two model counts
+    over the symbols of both.
+    """
+    if knowledge is None:
+        knowledge = And()
+    both = And(knowledge, query)
+    symbols = both.compile().symbols
+    models = count_models(knowledge, symbols, processes, width)
+    if not models:
+        raise Exception("knowledge base has no models")
+    return count_models(both, symbols, processes, width) / models
@@ -9,38 +9,38 @@ BKnave = Symbol("B is a Knave")
 CKnight = Symbol("C is a Knight")
 CKnave = Symbol("C is a Knave")
 
-start_rules = And(
+start_rules = intern(And(
     Or(AKnight, AKnave),
     Or(BKnight, BKnave),
     Or(CKnight, CKnave),
     Not(And(AKnight, AKnave)),
     Not(And(BKnight, BKnave)),
     Not(And(CKnight, CKnave))
-)
+))
 
 # Puzzle 0
 # A says "I am both a knight and a knave."
-knowledge0 = And(
+knowledge0 = intern(And(
     start_rules,
     Implication(AKnight, And(AKnight, AKnave)),
     Implication(AKnave, Not(And(AKnight, AKnave)))
 
-)
+))
 
 # Puzzle 1
 # A says "We are both knaves."
 # B says nothing.
-knowledge1 = And(
+knowledge1 = intern(And(
     start_rules,
     # A says "We are both knaves."
     Implication(AKnight, And(AKnave, BKnave)),
     Implication(AKnave, Not(And(AKnave, BKnave)))
-)
+))
 
 # Puzzle 2
 # A says "We are the same kind."
 # B says "We are of different kinds."
-knowledge2 = And(
+knowledge2 = intern(And(
     start_rules,
     # A says "We are the same kind."
     Implication(AKnight, And(AKnight, BKnight)),
@@ -49,14 +49,14 @@ knowledge2 = And(
     Implication(BKnight, And(BKnight, AKnave)),
     Implication(BKnave, Not(And(BKnave, AKnight)))
 
-)
+))
 
 # Puzzle 3
 # A says either "I am a knight." or "I am a knave.", but you don't know which.
 # B says "A said 'I am a knave'."
 # B says "C is a knave."
 # C says "A is a knight."
-knowledge3 = And(
+knowledge3 = intern(And(
     start_rules,
     # A says either "I am a knight." or "I am a knave.", but you don't know which.  
     Implication(AKnight, Or(AKnight, AKnave)),
@@ -72,7 +72,7 @@ knowledge3 = And(
     # C says "A is a knight."
     Implication(CKnight, AKnight),
     Implication(CKnave, Not(AKnight))
-)
+))
 
 
 def main():
@@ -88,8 +88,9 @@ def main():
         if len(knowledge.conjuncts) == 0:
             print("    Not yet implemented.")
         else:
-            for symbol in symbols:
-                if model_check(knowledge, symbol):
+            kb = KnowledgeBase(knowledge)
+            for symbol, entailed in zip(symbols, kb.entails_all(symbols)):
+                if entailed:
                     print(f"    {symbol}")
 
 
@@ -0,0 +1,330 @@
+"""
+CDCL SAT solver
+
+Clauses are lists of non-zero integers, as in the DIMACS format: the
+variable v is the literal v and its negation is -v. Units are propagated
+through two watched literals per clause, so assigning a literal only
+visits the clauses watching its negation. Every conflict teaches a clause
+cut at the first unique implication point; the search jumps back to the
+level where that clause becomes unit and branches next on the variables
+most active in recent conflicts.
+
+    python sat.py problem.cnf   solves a DIMACS file
+"""
+
+import sys
+import time
+
+# Factor by which the activity bump grows after every conflict, so older
+# conflicts count for less
+DECAY = 1 / 0.95
+
+# Activity past which all activities are scaled down to avoid overflow
+RESCALE = 1e100
+
+
+class Solver():
+
+    def __init__(self):
+        self.clauses = []
+        self.learned = []
+        self.watches = {}
+
+        # Per variable, indexed from 1
+        self.values = [None]
+        self.levels = [0]
+        self.reasons = [None]
+        self.activity = [0.0]
+        self.phases = [False]
+
+        # Assigned literals in order, and where each decision level starts
+        self.trail = []
+        self.limits = []
+
+        # Next trail position to propagate
+        self.head = 0
+
+        self.bump = 1.0
+        self.ok = True
+        self.model = None
+        self.conflicts = 0
+        self.decisions = 0
+
+    def reserve(self, variable):
+        """Makes room for every variable up to the given one."""
+        while len(self.values) <= variable:
+            v = len(self.values)
+            self.values.append(None)
+            self.levels.append(0)
+            self.reasons.append(None)
+            self.activity.append(0.0)
+            self.phases.append(False)
+            self.watches[v] = []
+            self.watches[-v] = []
+
+    def value(self, literal):
+        """Returns True or False if a literal is assigned, None if not."""
+        value = self.values[abs(literal)]
+        if value is None or literal > 0:
+            return value
+        return not value
+
+    def add_clause(self, clause):
+        """
+        Adds a clause. Returns False if the clauses can no longer be
+        satisfied, True otherwise.
+        """
+        self.backtrack(0)
+        if not self.ok:
+            return False
+        clause = set(clause)
+        literals = []
+        for literal in clause:
+            if literal == 0:
+                raise ValueError("0 is not a literal")
+            self.reserve(abs(literal))
+
+            # Drops clauses that always hold and literals that never do
+            value = self.value(literal)
+            if value is True or -literal in clause:
+                return True
+            if value is None:
+                literals.append(literal)
+
+        if not literals:
+            self.ok = False
+        elif len(literals) == 1:
+            self.assign(literals[0], None)
+            self.ok = self.propagate() is None
+        else:
+            self.clauses.append(literals)
+            self.watch(literals)
+        return self.ok
+
+    def watch(self, clause):
+        """Watches the first two literals of a clause."""
+        self.watches[clause[0]].append(clause)
+        self.watches[clause[1]].append(clause)
+
+    def assign(self, literal, reason):
+        """Makes a literal true at the current level, forced by a clause."""
+        v = abs(literal)
+        self.values[v] = literal > 0
+        self.levels[v] = len(self.limits)
+        self.reasons[v] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Assigns every literal a clause forces. Returns a clause whose
+        literals are all false, or None if there is no conflict.
+
+        Each clause keeps its two watched literals first; the literal a
+        clause forces is moved to the front before it is assigned.
+        """
+        value = self.value
+        while self.head < len(self.trail):
+            false = -self.trail[self.head]
+            self.head += 1
+            watchers = self.watches[false]
+            self.watches[false] = kept = []
+            for n, clause in enumerate(watchers):
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], false
+                first = clause[0]
+                if value(first) is True:
+                    kept.append(clause)
+                    continue
+
+                # Looks for another literal that is not false to watch
+                for k in range(2, len(clause)):
+                    if value(clause[k]) is not False:
+                        clause[1], clause[k] = clause[k], false
+                        self.watches[clause[1]].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if value(first) is False:
+                        kept.extend(watchers[n + 1:])
+                        self.head = len(self.trail)
+                        return clause
+                    self.assign(first, clause)
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns the clause learned from a conflict and the level to jump
+        back to. The clause resolves the conflict with the reasons of the
+        current level's literals until one literal of that level is left,
+        which comes first; the literal of the highest other level is second.
+        """
+        level = len(self.limits)
+        seen = set()
+        learned = [None]
+        pending = 0
+        index = len(self.trail) - 1
+        clause = conflict
+        literal = None
+        while True:
+            for q in clause:
+                v = abs(q)
+                if q == literal or v in seen or self.levels[v] == 0:
+                    continue
+                seen.add(v)
+                self.bump_activity(v)
+                if self.levels[v] == level:
+                    pending += 1
+                else:
+                    learned.append(q)
+
+            # Resolves on the latest literal of this level in the clause
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.reasons[abs(literal)]
+        learned[0] = -literal
+
+        if len(learned) == 1:
+            return learned, 0
+        k = max(range(1, len(learned)),
+                key=lambda i: self.levels[abs(learned[i])])
+        learned[1], learned[k] = learned[k], learned[1]
+        return learned, self.levels[abs(learned[1])]
+
+    def bump_activity(self, variable):
+        """Raises the activity of a variable seen in a conflict."""
+        self.activity[variable] += self.bump
+        if self.activity[variable] > RESCALE:
+            self.activity = [a / RESCALE for a in self.activity]
+            self.bump /= RESCALE
+
+    def backtrack(self, level):
+        """Undoes every assignment above a decision level."""
+        if len(self.limits) <= level:
+            return
+        start = self.limits[level]
+        for literal in self.trail[start:]:
+            v = abs(literal)
+            self.phases[v] = literal > 0
+            self.values[v] = None
+            self.reasons[v] = None
+        del self.trail[start:]
+        del self.limits[level:]
+        self.head = start
+
+    def choose(self):
+        """Returns the most active unassigned variable, or None."""
+        best = None
+        top = -1.0
+        for v in range(1, len(self.values)):
+            if self.values[v] is None and self.activity[v] > top:
+                best = v
+                top = self.activity[v]
+        return best
+
+    def solve(self, assumptions=()):
+        """
+        Returns True if the clauses can all be satisfied with every
+        assumed literal true, leaving the value of every variable in
+        self.model, or False if not.
+
+        Assumptions hold for this call only. They are decided first, one
+        level each, so every clause learned under them still follows from
+        the clauses alone and is kept for later calls.
+        """
+        self.model = None
+        if not self.ok:
+            return False
+        self.backtrack(0)
+        for literal in assumptions:
+            self.reserve(abs(literal))
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                if not self.limits:
+                    self.ok = False
+                    return False
+                learned, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learned) == 1:
+                    self.assign(learned[0], None)
+                else:
+                    self.learned.append(learned)
+                    self.watch(learned)
+                    self.assign(learned[0], learned)
+                self.bump *= DECAY
+                continue
+
+            level = len(self.limits)
+            if level < len(assumptions):
+                literal = assumptions[level]
+                value = self.value(literal)
+                if value is False:
+                    return False
+
+                # An assumption already true still takes its level
+                self.limits.append(len(self.trail))
+                if value is None:
+                    self.assign(literal, None)
+                continue
+
+            variable = self.choose()
+            if variable is None:
+                self.model = list(self.values)
+                return True
+            self.decisions += 1
+            self.limits.append(len(self.trail))
+            self.assign(variable if self.phases[variable] else -variable, None)
+
+
+def parse(text):
+    """Returns the clauses of a problem in DIMACS CNF format."""
+    clauses = []
+    clause = []
+    for line in text.splitlines():
+        if line.startswith(("c", "p", "%")):
+            continue
+        for token in line.split():
+            literal = int(token)
+            if literal == 0:
+                clauses.append(clause)
+                clause = []
+            else:
+                clause.append(literal)
+    if clause:
+        clauses.append(clause)
+    return clauses
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python sat.py problem.cnf")
+    with open(sys.argv[1]) as f:
+        clauses = parse(f.read())
+
+    start = time.perf_counter()
+    solver = Solver()
+    for clause in clauses:
+        solver.add_clause(clause)
+    satisfiable = solver.solve()
+    elapsed = time.perf_counter() - start
+
+    if satisfiable:
+        print("s SATISFIABLE")
+        print("v " + " ".join(
+            str(v if solver.model[v] else -v)
+            for v in range(1, len(solver.model))
+        ) + " 0")
+    else:
+        print("s UNSATISFIABLE")
+    print(f"c {solver.decisions} decisions, {solver.conflicts} conflicts, "
+          f"{len(solver.learned)} learned clauses in {elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
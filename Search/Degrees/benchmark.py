@@ -0,0 +1,203 @@
+"""
+Benchmark harness for the degrees search strategies.
+
+Runs fixed query sets through every strategy and reports wall time,
+people explored, peak frontier size and peak memory, collected through
+degrees.search_hooks. The same hooks can export these counters to any
+metrics pipeline:
+
+    degrees.search_hooks.append(lambda stats: send(stats.__dict__))
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tracemalloc
+
+import degrees
+import landmarks
+import lookup
+import weighted
+
+# Strategies that minimize hop count and so must agree on degrees
+EXACT = ["bfs", "bidirectional", "landmarks", "uniform-cost"]
+
+# Every strategy the harness can run
+STRATEGIES = EXACT + ["recency", "popularity"]
+
+# Fixed query sets, by dataset directory name
+QUERIES = {
+    "small": [
+        ("Kevin Bacon", "Tom Hanks"),
+        ("Kevin Bacon", "Tom Cruise"),
+        ("Tom Cruise", "Sally Field"),
+        ("Mandy Patinkin", "Gary Sinise"),
+        ("Demi Moore", "Valeria Golino"),
+        ("Cary Elwes", "Bill Paxton"),
+        ("Jack Nicholson", "Robin Wright"),
+        ("Emma Watson", "Kevin Bacon")
+    ],
+    "large": [
+        ("Kevin Bacon", "Tom Hanks"),
+        ("Kevin Bacon", "Emma Watson"),
+        ("Tom Hanks", "Marilyn Monroe"),
+        ("Charlie Chaplin", "Zendaya"),
+        ("Audrey Hepburn", "Chris Pratt"),
+        ("Humphrey Bogart", "Jennifer Lawrence"),
+        ("Meryl Streep", "Bruce Lee"),
+        ("Shah Rukh Khan", "Tom Cruise"),
+        ("Jackie Chan", "Greta Garbo"),
+        ("Toshirô Mifune", "Scarlett Johansson")
+    ]
+}
+
+
+def strategies(directory, names):
+    """
+    Returns the named search strategies, building the landmark index
+    up front so it is not timed as part of a query.
+    """
+    available = {
+        "bfs": degrees.shortest_path,
+        "bidirectional": degrees.bidirectional_shortest_path,
+        "uniform-cost": weighted.best_first_search,
+        "recency": lambda source, target: weighted.best_first_search(
+            source, target, weighted.recency(), strategy="recency"
+        ),
+        "popularity": lambda source, target: weighted.best_first_search(
+            source, target, weighted.popularity(), strategy="popularity"
+        )
+    }
+    if "landmarks" in names:
+        index = landmarks.load_or_build(directory)
+        available["landmarks"] = (
+            lambda source, target: landmarks.shortest_path(source, target,
+                                                           index)
+        )
+    return {name: available[name] for name in names}
+
+
+def query_set(directory, sample):
+    """
+    Returns (source, target) person_id pairs: a random sample of the
+    given size, or the fixed set for a dataset directory.
+    """
+    if sample:
+        rng = random.Random(0)
+        cast = sorted(
+            person_id for person_id in degrees.people
+            if degrees.people[person_id]["movies"]
+        )
+        return [(rng.choice(cast), rng.choice(cast)) for _ in range(sample)]
+
+    name = os.path.basename(os.path.normpath(directory))
+    if name not in QUERIES:
+        sys.exit(f"No fixed queries for {name}; use --sample N.")
+    names = lookup.index()
+    pairs = []
+    for source, target in QUERIES[name]:
+        source_id = names.resolve(source)
+        target_id = names.resolve(target)
+        if source_id is None or target_id is None:
+            print(f"Skipping {source} - {target}: person not found.",
+                  file=sys.stderr)
+            continue
+        pairs.append((source_id, target_id))
+    return pairs
+
+
+def run(search, pairs):
+    """
+    Runs a search over every pair, returning the SearchStats of each and
+    the peak traced memory of each, measured in a second, traced pass.
+    """
+    results = []
+    degrees.search_hooks.append(results.append)
+    try:
+        for source, target in pairs:
+            search(source, target)
+    finally:
+        degrees.search_hooks.remove(results.append)
+
+    peaks = []
+    tracemalloc.start()
+    for source, target in pairs:
+        tracemalloc.reset_peak()
+        search(source, target)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+    return results, peaks
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the degrees search strategies."
+    )
+    parser.add_argument("directory", nargs="?", default="small")
+    parser.add_argument("--strategy", action="append",
+                        choices=STRATEGIES,
+                        help="strategy to run (default: all)")
+    parser.add_argument("--backend", default="dict",
+                        choices=["dict", "compact", "snapshot"])
+    parser.add_argument("--sample", type=int, default=0, metavar="N",
+                        help="use N random pairs instead of the fixed set")
+    parser.add_argument("--json", action="store_true",
+                        help="print one JSON line per search")
+    args = parser.parse_args()
+
+    if args.backend == "snapshot":
+        degrees.use_snapshot(args.directory)
+    else:
+        degrees.load_data(args.directory)
+        if args.backend == "compact":
+            degrees.use_compact_graph()
+    pairs = query_set(args.directory, args.sample)
+
+    names = args.strategy or STRATEGIES
+    rows = []
+    answers = {}
+    for name, search in strategies(args.directory, names).items():
+        results, peaks = run(search, pairs)
+        for stats, peak in zip(results, peaks):
+            if args.json:
+                print(json.dumps({
+                    "strategy": name,
+                    "backend": args.backend,
+                    "source": stats.source,
+                    "target": stats.target,
+                    "degrees": stats.degrees,
+                    "explored": stats.explored,
+                    "max_frontier": stats.max_frontier,
+                    "seconds": stats.seconds,
+                    "peak_memory": peak
+                }))
+            if name in EXACT:
+                key = (stats.source, stats.target)
+                answers.setdefault(key, set()).add(stats.degrees)
+        rows.append((
+            name,
+            sum(stats.seconds for stats in results),
+            sum(stats.explored for stats in results),
+            max((stats.max_frontier for stats in results), default=0),
+            max(peaks, default=0)
+        ))
+
+    # Every shortest-path strategy must agree on the degrees of separation
+    for (source, target), found in answers.items():
+        if len(found) > 1:
+            print(f"Mismatch for {source} - {target}: {sorted(found, key=str)}",
+                  file=sys.stderr)
+
+    if not args.json:
+        print(f"{len(pairs)} queries, {args.backend} backend")
+        print(f"{'strategy':<15}{'time (ms)':>12}{'explored':>12}"
+              f"{'frontier':>12}{'memory (KB)':>14}")
+        for name, seconds, explored, frontier, peak in rows:
+            print(f"{name:<15}{seconds * 1000:>12.1f}{explored:>12}"
+                  f"{frontier:>12}{peak / 1024:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+"""
+Compact integer-indexed graph store for the degrees data.
+
+People and movies are remapped to dense integers and the star relation
+is held as CSR (offset + index) arrays in both directions, so the graph
+costs a few bytes per star instead of a Python set entry per star.
+String IDs are only translated at the edges.
+
+People, movies and stars added after the arrays were built are kept in
+small per-index lists alongside them, so a loaded graph (even a
+memory-mapped snapshot) can grow without being rebuilt.
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+from array import array
+from bisect import insort
+from collections import ChainMap
+from collections.abc import Mapping, Sequence
+
+# Per-row tables, in the order the constructor takes them
+TABLES = ["person_ids", "person_names", "person_births",
+          "movie_ids", "movie_titles", "movie_years"]
+
+
+class CompactGraph():
+    """
+    Degrees graph with people and movies stored as dense integers.
+
+    `person_offsets[i]:person_offsets[i + 1]` slices `person_movies` to
+    the movies person i starred in, and `movie_offsets[m]:movie_offsets[m + 1]`
+    slices `movie_stars` to the people who starred in movie m.
+    """
+
+    def __init__(self, person_ids, person_names, person_births,
+                 movie_ids, movie_titles, movie_years,
+                 person_offsets, person_movies, movie_offsets, movie_stars,
+                 person_index=None, movie_index=None, name_index=None):
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.person_births = person_births
+        self.movie_ids = movie_ids
+        self.movie_titles = movie_titles
+        self.movie_years = movie_years
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_stars = movie_stars
+
+        # Translate string IDs and lowercase names to integers
+        if person_index is None:
+            person_index = {
+                person_id: i for i, person_id in enumerate(person_ids)
+            }
+        if movie_index is None:
+            movie_index = {
+                movie_id: m for m, movie_id in enumerate(movie_ids)
+            }
+        if name_index is None:
+            name_index = {}
+            for i, name in enumerate(person_names):
+                name_index.setdefault(name.lower(), []).append(i)
+        self.person_index = person_index
+        self.movie_index = movie_index
+        self.name_index = name_index
+
+        # Full sorted adjacency of every person and movie changed since
+        # the CSR arrays were built, which it overrides
+        self.added_movies = {}
+        self.added_stars = {}
+
+        # Dict-shaped views, so code written against degrees' tables works
+        self.people = PeopleView(self)
+        self.movies = MoviesView(self)
+        self.names = NamesView(self)
+
+    @classmethod
+    def from_dicts(cls, people, movies):
+        """
+        Builds a compact graph from degrees' `people` and `movies` dicts.
+        """
+        person_ids = list(people)
+        movie_ids = list(movies)
+        movie_index = {movie_id: m for m, movie_id in enumerate(movie_ids)}
+        person_index = {
+            person_id: i for i, person_id in enumerate(person_ids)
+        }
+
+        person_offsets = array("q", [0])
+        person_movies = array("i")
+        for person_id in person_ids:
+            person_movies.extend(sorted(
+                movie_index[movie_id]
+                for movie_id in people[person_id]["movies"]
+            ))
+            person_offsets.append(len(person_movies))
+
+        movie_offsets = array("q", [0])
+        movie_stars = array("i")
+        for movie_id in movie_ids:
+            movie_stars.extend(sorted(
+                person_index[person_id]
+                for person_id in movies[movie_id]["stars"]
+            ))
+            movie_offsets.append(len(movie_stars))
+
+        return cls(
+            person_ids,
+            [people[person_id]["name"] for person_id in person_ids],
+            [people[person_id]["birth"] for person_id in person_ids],
+            movie_ids,
+            [movies[movie_id]["title"] for movie_id in movie_ids],
+            [movies[movie_id]["year"] for movie_id in movie_ids],
+            person_offsets, person_movies, movie_offsets, movie_stars,
+            person_index=person_index, movie_index=movie_index
+        )
+
+    def movies_for(self, i):
+        """Returns the movie indices person i starred in."""
+        if i in self.added_movies:
+            return self.added_movies[i]
+        return self.person_movies[
+            self.person_offsets[i]:self.person_offsets[i + 1]
+        ]
+
+    def stars_for(self, m):
+        """Returns the person indices who starred in movie m."""
+        if m in self.added_stars:
+            return self.added_stars[m]
+        return self.movie_stars[
+            self.movie_offsets[m]:self.movie_offsets[m + 1]
+        ]
+
+    def make_growable(self):
+        """
+        Wraps read-only tables and indexes, such as those of a snapshot,
+        so rows can be appended to them.
+        """
+        for name in TABLES:
+            table = getattr(self, name)
+            if not hasattr(table, "append"):
+                setattr(self, name, GrowableTable(table))
+        for name in ["person_index", "movie_index", "name_index"]:
+            index = getattr(self, name)
+            if not isinstance(index, (dict, ChainMap)):
+                setattr(self, name, ChainMap({}, index))
+
+    def add_person(self, person_id, name, birth):
+        """Appends a person with no movies and returns their index."""
+        self.make_growable()
+        i = len(self.person_ids)
+        self.person_ids.append(person_id)
+        self.person_names.append(name)
+        self.person_births.append(birth)
+        self.person_index[person_id] = i
+        key = name.lower()
+        self.name_index[key] = list(self.name_index.get(key, ())) + [i]
+        self.added_movies[i] = []
+        return i
+
+    def add_movie(self, movie_id, title, year):
+        """Appends a movie with no stars and returns its index."""
+        self.make_growable()
+        m = len(self.movie_ids)
+        self.movie_ids.append(movie_id)
+        self.movie_titles.append(title)
+        self.movie_years.append(year)
+        self.movie_index[movie_id] = m
+        self.added_stars[m] = []
+        return m
+
+    def add_star(self, i, m):
+        """
+        Records that person i starred in movie m. Returns False if that
+        was already known.
+        """
+        if m in self.movies_for(i):
+            return False
+        if i not in self.added_movies:
+            self.added_movies[i] = list(self.movies_for(i))
+        if m not in self.added_stars:
+            self.added_stars[m] = list(self.stars_for(m))
+        insort(self.added_movies[i], m)
+        insort(self.added_stars[m], i)
+        return True
+
+    def csr_arrays(self):
+        """
+        Returns the four CSR arrays with every added person, movie and
+        star merged in, in constructor order.
+        """
+        if not self.added_movies and not self.added_stars:
+            return [self.person_offsets, self.person_movies,
+                    self.movie_offsets, self.movie_stars]
+        person_offsets = array("q", [0])
+        person_movies = array("i")
+        for i in range(len(self.person_ids)):
+            person_movies.extend(self.movies_for(i))
+            person_offsets.append(len(person_movies))
+        movie_offsets = array("q", [0])
+        movie_stars = array("i")
+        for m in range(len(self.movie_ids)):
+            movie_stars.extend(self.stars_for(m))
+            movie_offsets.append(len(movie_stars))
+        return [person_offsets, person_movies, movie_offsets, movie_stars]
+
+    def neighbor_indices(self, i):
+        """
+        Yields (movie index, person index) pairs for people
+        who starred with person i.
+        """
+        for m in self.movies_for(i):
+            for j in self.stars_for(m):
+                yield m, j
+
+    def neighbors_for_person(self, person_id):
+        """
+        Returns (movie_id, person_id) pairs for people
+        who starred with a given person.
+        """
+        neighbors = set()
+        for m in self.movies_for(self.person_index[person_id]):
+            movie_id = self.movie_ids[m]
+            for j in self.stars_for(m):
+                neighbors.add((movie_id, self.person_ids[j]))
+        return neighbors
+
+
+class GrowableTable(Sequence):
+    """A read-only table followed by rows appended since it was loaded."""
+
+    def __init__(self, base):
+        self.base = base
+        self.added = []
+
+    def __getitem__(self, i):
+        if i < len(self.base):
+            return self.base[i]
+        return self.added[i - len(self.base)]
+
+    def __len__(self):
+        return len(self.base) + len(self.added)
+
+    def append(self, value):
+        self.added.append(value)
+
+
+class PeopleView(Mapping):
+    """Read-only `people` table backed by a compact graph."""
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, person_id):
+        graph = self.graph
+        i = graph.person_index[person_id]
+        return {
+            "name": graph.person_names[i],
+            "birth": graph.person_births[i],
+            "movies": {graph.movie_ids[m] for m in graph.movies_for(i)}
+        }
+
+    def __contains__(self, person_id):
+        return person_id in self.graph.person_index
+
+    def __iter__(self):
+        return iter(self.graph.person_ids)
+
+    def __len__(self):
+        return len(self.graph.person_ids)
+
+
+class MoviesView(Mapping):
+    """Read-only `movies` table backed by a compact graph."""
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, movie_id):
+        graph = self.graph
+        m = graph.movie_index[movie_id]
+        return {
+            "title": graph.movie_titles[m],
+            "year": graph.movie_years[m],
+            "stars": {graph.person_ids[j] for j in graph.stars_for(m)}
+        }
+
+    def __contains__(self, movie_id):
+        return movie_id in self.graph.movie_index
+
+    def __iter__(self):
+        return iter(self.graph.movie_ids)
+
+    def __len__(self):
+        return len(self.graph.movie_ids)
+
+
+class NamesView(Mapping):
+    """Read-only `names` table backed by a compact graph."""
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, name):
+        graph = self.graph
+        return {graph.person_ids[i] for i in graph.name_index[name]}
+
+    def __contains__(self, name):
+        return name in self.graph.name_index
+
+    def __iter__(self):
+        return iter(self.graph.name_index)
+
+    def __len__(self):
+        return len(self.graph.name_index)
+
+
+def time_queries(search, pairs):
+    """Returns the mean seconds per query for a search function."""
+    start = time.perf_counter()
+    for source, target in pairs:
+        search(source, target)
+    return (time.perf_counter() - start) / len(pairs)
+
+
+def main():
+    """
+    Reports memory and per-query latency of the dict and compact backends.
+    """
+    import degrees
+
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python compact.py [directory] [queries]")
+    directory = sys.argv[1] if len(sys.argv) >= 2 else "large"
+    queries = int(sys.argv[2]) if len(sys.argv) == 3 else 100
+
+    rows = []
+    pairs = None
+    for backend in ["dict", "compact"]:
+
+        # Start every backend from freshly loaded, empty tables
+        degrees.names, degrees.people, degrees.movies = {}, {}, {}
+        degrees.graph = None
+        tracemalloc.start()
+        start = time.perf_counter()
+        degrees.load_data(directory)
+        if backend == "compact":
+            degrees.use_compact_graph()
+        load = time.perf_counter() - start
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        # Fixed random queries between people who starred in something
+        if pairs is None:
+            rng = random.Random(0)
+            cast = [
+                person_id for person_id, person in degrees.people.items()
+                if person["movies"]
+            ]
+            pairs = [
+                (rng.choice(cast), rng.choice(cast)) for _ in range(queries)
+            ]
+        query = time_queries(degrees.bidirectional_shortest_path, pairs)
+        rows.append((backend, memory, load, query))
+
+    print(f"{'backend':<10}{'memory (MB)':>14}{'load (s)':>12}"
+          f"{'query (ms)':>14}")
+    for backend, memory, load, query in rows:
+        print(f"{backend:<10}{memory / 2 ** 20:>14.1f}{load:>12.2f}"
+              f"{query * 1000:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
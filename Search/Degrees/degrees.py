@@ -1,7 +1,13 @@
 import csv
+import multiprocessing
+import operator
+import os
 import sys
+import time
 
-from util import Node, StackFrontier, QueueFrontier
+import snapshot
+from compact import CompactGraph
+from util import Node, StackFrontier, QueueFrontier, SearchStats
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,44 +18,250 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Compact integer-indexed store, set once use_compact_graph is called
+graph = None
 
-def load_data(directory):
+# Rows read between calls to a load_data progress callback
+PROGRESS_ROWS = 100000
+
+# Callables run with the SearchStats of every finished search
+search_hooks = []
+
+# Callables run with (kind, key) after each change to the loaded data:
+# ("person", person_id), ("movie", movie_id) or ("star", (person_id, movie_id))
+update_hooks = []
+
+# Delta directories applied since the data was loaded, in order
+applied_deltas = []
+
+
+def load_data(directory, progress=None):
     """
     Load data from CSV files into memory.
+
+    Rows are read as tuples and repeated IDs and years are interned, so
+    every set shares one string per ID. If given, progress is called with
+    (filename, rows read, seconds elapsed) while each file loads.
+
+    Returns the number of stars rows skipped because they reference
+    a person or movie that is not in the data.
     """
+    intern = sys.intern
+
     # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
+    rows = read_rows(f"{directory}/people.csv", ["id", "name", "birth"],
+                     progress)
+    for person_id, name, birth in rows:
+        person_id = intern(person_id)
+        people[person_id] = {
+            "name": name,
+            "birth": intern(birth),
+            "movies": set()
+        }
+        if name.lower() not in names:
+            names[name.lower()] = {person_id}
+        else:
+            names[name.lower()].add(person_id)
 
     # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set()
-            }
+    rows = read_rows(f"{directory}/movies.csv", ["id", "title", "year"],
+                     progress)
+    for movie_id, title, year in rows:
+        movies[intern(movie_id)] = {
+            "title": title,
+            "year": intern(year),
+            "stars": set()
+        }
 
     # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
+    skipped = 0
+    rows = read_rows(f"{directory}/stars.csv", ["person_id", "movie_id"],
+                     progress)
+    for person_id, movie_id in rows:
+        person = people.get(person_id)
+        movie = movies.get(movie_id)
+        if person is None or movie is None:
+            skipped += 1
+            continue
+        person["movies"].add(intern(movie_id))
+        movie["stars"].add(intern(person_id))
+    return skipped
+
+
+def read_rows(path, columns, progress=None):
+    """
+    Yields the named columns of each row of a CSV file as a tuple,
+    calling progress every PROGRESS_ROWS rows and at the end.
+    """
+    filename = os.path.basename(path)
+    start = time.perf_counter()
+    count = 0
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        select = operator.itemgetter(*[header.index(c) for c in columns])
         for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+            if not row:
+                continue
+            yield select(row)
+            count += 1
+            if progress is not None and count % PROGRESS_ROWS == 0:
+                progress(filename, count, time.perf_counter() - start)
+    if progress is not None and count % PROGRESS_ROWS:
+        progress(filename, count, time.perf_counter() - start)
+
+
+def report_progress(filename, rows, seconds):
+    """Prints how far loading a CSV file has got."""
+    rate = rows / seconds if seconds else 0
+    print(f"    {filename}: {rows:,} rows ({rate:,.0f} rows/s)")
+
+
+def use_compact_graph():
+    """
+    Moves the loaded data into a compact integer-indexed store and
+    releases the dict tables. `names`, `people` and `movies` become
+    read-only views over the store, so the rest of the module is unchanged.
+    """
+    global graph, names, people, movies
+    graph = CompactGraph.from_dicts(people, movies)
+    names, people, movies = graph.names, graph.people, graph.movies
+
+
+def use_snapshot(directory, progress=None):
+    """
+    Loads data from the binary snapshot next to the CSV files, parsing
+    the CSV files and writing a fresh snapshot only when they changed.
+
+    Returns the number of stars rows skipped while parsing, or None if
+    the snapshot was up to date.
+    """
+    global graph, names, people, movies
+    skipped = None
+    graph = snapshot.load(directory)
+    if graph is None:
+        skipped = load_data(directory, progress)
+        use_compact_graph()
+        try:
+            snapshot.save(directory, graph)
+        except OSError:
+            pass
+    names, people, movies = graph.names, graph.people, graph.movies
+    return skipped
+
+
+def create_pool(directory, processes, start_method=None):
+    """
+    Returns a process pool whose workers see the loaded data. Forked
+    workers share it copy-on-write; workers started any other way map
+    the snapshot and apply the same deltas. The start method defaults
+    to fork where there is one, else spawn.
+    """
+    if start_method is None:
+        if "fork" in multiprocessing.get_all_start_methods():
+            start_method = "fork"
+        else:
+            start_method = "spawn"
+    if start_method == "fork":
+        return multiprocessing.get_context("fork").Pool(processes)
+    return multiprocessing.get_context(start_method).Pool(
+        processes, initializer=use_snapshot_and_deltas,
+        initargs=(directory, list(applied_deltas))
+    )
+
+
+def use_snapshot_and_deltas(directory, deltas):
+    """Loads the snapshot in a directory, then applies each delta."""
+    use_snapshot(directory)
+    for delta in deltas:
+        apply_delta(delta)
+
+
+def add_person(person_id, name, birth=""):
+    """
+    Adds a person with no movies to the loaded data.
+    Returns False, changing nothing, if the person_id is taken.
+    """
+    if person_id in people:
+        return False
+    person_id = sys.intern(person_id)
+    birth = sys.intern(birth)
+    if graph is not None:
+        graph.add_person(person_id, name, birth)
+    else:
+        people[person_id] = {"name": name, "birth": birth, "movies": set()}
+        names.setdefault(name.lower(), set()).add(person_id)
+    for hook in update_hooks:
+        hook("person", person_id)
+    return True
+
+
+def add_movie(movie_id, title, year=""):
+    """
+    Adds a movie with no stars to the loaded data.
+    Returns False, changing nothing, if the movie_id is taken.
+    """
+    if movie_id in movies:
+        return False
+    movie_id = sys.intern(movie_id)
+    year = sys.intern(year)
+    if graph is not None:
+        graph.add_movie(movie_id, title, year)
+    else:
+        movies[movie_id] = {"title": title, "year": year, "stars": set()}
+    for hook in update_hooks:
+        hook("movie", movie_id)
+    return True
+
+
+def add_star(person_id, movie_id):
+    """
+    Records that a person starred in a movie.
+    Returns False if the person or the movie is not in the data.
+    """
+    if person_id not in people or movie_id not in movies:
+        return False
+    if graph is not None:
+        added = graph.add_star(graph.person_index[person_id],
+                               graph.movie_index[movie_id])
+    else:
+        added = movie_id not in people[person_id]["movies"]
+        people[person_id]["movies"].add(sys.intern(movie_id))
+        movies[movie_id]["stars"].add(sys.intern(person_id))
+    if added:
+        for hook in update_hooks:
+            hook("star", (person_id, movie_id))
+    return True
+
+
+def apply_delta(directory, progress=None):
+    """
+    Adds the rows of a delta directory to the loaded data, in place.
+    The directory holds any of people.csv, movies.csv and stars.csv in
+    the same format as the full data; rows for people and movies that
+    are already loaded are ignored.
+
+    Returns the number of stars rows skipped because they reference
+    a person or movie that is not in the data.
+    """
+    if not os.path.isdir(directory):
+        raise FileNotFoundError(f"no such delta directory: {directory}")
+    path = os.path.join(directory, "people.csv")
+    if os.path.exists(path):
+        for row in read_rows(path, ["id", "name", "birth"], progress):
+            add_person(*row)
+    path = os.path.join(directory, "movies.csv")
+    if os.path.exists(path):
+        for row in read_rows(path, ["id", "title", "year"], progress):
+            add_movie(*row)
+    skipped = 0
+    path = os.path.join(directory, "stars.csv")
+    if os.path.exists(path):
+        for row in read_rows(path, ["person_id", "movie_id"], progress):
+            if not add_star(*row):
+                skipped += 1
+    applied_deltas.append(directory)
+    return skipped
 
 
 def main():
@@ -59,7 +271,9 @@ def main():
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    skipped = use_snapshot(directory, report_progress)
+    if skipped:
+        print(f"Skipped {skipped} stars rows with an unknown person or movie.")
     print("Data loaded.")
 
     source = person_id_for_name(input("Name: "))
@@ -69,7 +283,7 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    path = bidirectional_shortest_path(source, target)
 
     if path is None:
         print("Not connected.")
@@ -92,12 +306,12 @@ def shortest_path(source, target):
     If no possible path, returns None.
     """
 
+    # Keep track of number of states explored and frontier size
+    stats = SearchStats("bfs", source, target)
+
     # If the source and the target is the same person
     if source == target:
-        return []
-
-    # Keep track of number of states explored
-    num_explored = 0
+        return stats.finish([], search_hooks)
 
     # Initialize frontier to just the starting position
     start = Node(state=source, parent=None, action=None)
@@ -111,11 +325,12 @@ def shortest_path(source, target):
     while True:
         # If nothing left in frontier, then no path
         if frontier.empty():
-            return None
+            return stats.finish(None, search_hooks)
             
         # Chose a node from the frontier
+        stats.frontier(len(frontier.frontier))
         node = frontier.remove()
-        num_explored += 1
+        stats.explored += 1
 
         # Mark node as explored
         explored.add(node.state)
@@ -140,10 +355,97 @@ def shortest_path(source, target):
 
                     for movie, person in id_s:
                         solution.append((movie, person))
-                    return solution
+                    return stats.finish(solution, search_hooks)
                 frontier.add(child)
 
 
+def bidirectional_shortest_path(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, growing one search
+    from the source and one from the target until they meet.
+
+    If no possible path, returns None.
+    """
+
+    # Keep track of number of states explored and frontier size
+    stats = SearchStats("bidirectional", source, target)
+
+    # If the source and the target is the same person
+    if source == target:
+        return stats.finish([], search_hooks)
+
+    # Maps every reached person to the (movie_id, person_id) step
+    # leading back towards the side's starting person
+    forward = {source: None}
+    backward = {target: None}
+    forward_layer = [source]
+    backward_layer = [target]
+
+    # Keep looping until one side runs out of people to expand
+    while forward_layer and backward_layer:
+        stats.frontier(len(forward_layer) + len(backward_layer))
+
+        # Always expand a whole layer of the smaller side
+        if len(forward_layer) <= len(backward_layer):
+            forward_layer, meeting = expand_layer(
+                forward_layer, forward, backward, stats
+            )
+        else:
+            backward_layer, meeting = expand_layer(
+                backward_layer, backward, forward, stats
+            )
+
+        # Both searches reached the same person, so the path is shortest
+        if meeting is not None:
+            return stats.finish(join_paths(meeting, forward, backward),
+                                search_hooks)
+
+    return stats.finish(None, search_hooks)
+
+
+def expand_layer(layer, reached, other, stats):
+    """
+    Expands every person in a search layer, recording how each new
+    person was reached. Returns the next layer and the first person
+    already reached by the other search, or None.
+    """
+    next_layer = []
+    for person_id in layer:
+        stats.explored += 1
+        for movie_id, neighbor_id in neighbors_for_person(person_id):
+            if neighbor_id in reached:
+                continue
+            reached[neighbor_id] = (movie_id, person_id)
+            if neighbor_id in other:
+                return next_layer, neighbor_id
+            next_layer.append(neighbor_id)
+    return next_layer, None
+
+
+def join_paths(meeting, forward, backward):
+    """
+    Joins the forward and backward searches at the meeting person
+    into a list of (movie_id, person_id) pairs from source to target.
+    """
+
+    # Walk back from the meeting person to the source
+    solution = []
+    person_id = meeting
+    while forward[person_id] is not None:
+        movie_id, parent_id = forward[person_id]
+        solution.append((movie_id, person_id))
+        person_id = parent_id
+    solution.reverse()
+
+    # Walk on from the meeting person to the target
+    person_id = meeting
+    while backward[person_id] is not None:
+        movie_id, person_id = backward[person_id]
+        solution.append((movie_id, person_id))
+    return solution
+
+
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
@@ -175,6 +477,8 @@ def neighbors_for_person(person_id):
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
+    if graph is not None:
+        return graph.neighbors_for_person(person_id)
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
@@ -0,0 +1,181 @@
+"""
+Single-source degree distributions and sampled graph statistics.
+
+One breadth-first search answers "how far is everyone from this person"
+in a single pass. A search never has to expand the same movie twice:
+once any star of a movie is reached, all of its stars are reached one
+degree later, so each search costs one visit per star.
+"""
+
+import argparse
+import random
+import sys
+
+import degrees
+
+
+def single_source(source):
+    """
+    Runs one breadth-first search outward from a person.
+
+    Returns a list with the number of people at each degree of
+    separation (index 0 is the source itself) and a dict mapping every
+    reachable person_id to the (movie_id, person_id) step back towards
+    the source, or None for the source.
+    """
+    counts = [1]
+    parents = {source: None}
+    expanded = set()
+    layer = [source]
+    while True:
+        next_layer = []
+        for person_id in layer:
+            for movie_id in degrees.people[person_id]["movies"]:
+                if movie_id in expanded:
+                    continue
+                expanded.add(movie_id)
+                for star_id in degrees.movies[movie_id]["stars"]:
+                    if star_id not in parents:
+                        parents[star_id] = (movie_id, person_id)
+                        next_layer.append(star_id)
+        if not next_layer:
+            return counts, parents
+        counts.append(len(next_layer))
+        layer = next_layer
+
+
+def path_to(parents, target):
+    """
+    Returns the list of (movie_id, person_id) pairs from the source of
+    a single-source search to the target, or None if it is unreachable.
+    """
+    if target not in parents:
+        return None
+    path = []
+    while parents[target] is not None:
+        movie_id, parent_id = parents[target]
+        path.append((movie_id, target))
+        target = parent_id
+    path.reverse()
+    return path
+
+
+def layer_counts(source):
+    """
+    Returns the number of people at each degree of separation from a
+    person, and one of the people furthest away.
+    """
+    graph = degrees.graph
+    if graph is None:
+        counts, parents = single_source(source)
+        return counts, next(reversed(parents))
+
+    # Search over integer indices without translating any IDs
+    i = graph.person_index[source]
+    reached = bytearray(len(graph.person_ids))
+    expanded = bytearray(len(graph.movie_ids))
+    reached[i] = 1
+    counts = [1]
+    layer = [i]
+    while True:
+        next_layer = []
+        for i in layer:
+            for m in graph.movies_for(i):
+                if expanded[m]:
+                    continue
+                expanded[m] = 1
+                for j in graph.stars_for(m):
+                    if not reached[j]:
+                        reached[j] = 1
+                        next_layer.append(j)
+        if not next_layer:
+            return counts, graph.person_ids[layer[0]]
+        counts.append(len(next_layer))
+        layer = next_layer
+
+
+def estimate(samples, processes=None, seed=0, directory=None):
+    """
+    Estimates the average degrees of separation and the diameter of the
+    graph from breadth-first searches out of randomly sampled people,
+    run in parallel.
+
+    The diameter is a lower bound: the largest distance seen from any
+    sample, improved by a second search from the furthest person found.
+    """
+    rng = random.Random(seed)
+    cast = [
+        person_id for person_id in degrees.people
+        if degrees.people[person_id]["movies"]
+    ]
+    sources = rng.sample(cast, min(samples, len(cast)))
+
+    distribution = []
+    diameter = 0
+    furthest = None
+    with degrees.create_pool(directory, processes) as pool:
+        for counts, far_id in pool.imap_unordered(layer_counts, sources):
+            for distance, count in enumerate(counts):
+                if distance == len(distribution):
+                    distribution.append(0)
+                distribution[distance] += count
+            if len(counts) - 1 > diameter:
+                diameter, furthest = len(counts) - 1, far_id
+
+    # Double sweep: the furthest person is a good end of a long path
+    if furthest is not None:
+        counts, _ = layer_counts(furthest)
+        diameter = max(diameter, len(counts) - 1)
+
+    # Pairs at distance 0 are the sources themselves
+    pairs = sum(distribution[1:])
+    total = sum(d * count for d, count in enumerate(distribution))
+    return {
+        "samples": len(sources),
+        "pairs": pairs,
+        "average": total / pairs if pairs else None,
+        "diameter": diameter,
+        "distribution": distribution
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Degree distributions on the degrees graph."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--from", dest="name", default="Kevin Bacon",
+                        help="person to measure everyone's distance from")
+    parser.add_argument("--sample", type=int, metavar="N",
+                        help="estimate average path length and diameter "
+                             "from N sampled people instead")
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+
+    print("Loading data...", file=sys.stderr)
+    degrees.use_snapshot(args.directory)
+    print("Data loaded.", file=sys.stderr)
+
+    if args.sample is not None:
+        result = estimate(args.sample, args.processes,
+                          directory=args.directory)
+        print(f"Samples: {result['samples']}")
+        average = result["average"]
+        print("Average degrees of separation: "
+              + ("n/a" if average is None else f"{average:.3f}"))
+        print(f"Diameter (lower bound): {result['diameter']}")
+        for distance, count in enumerate(result["distribution"]):
+            print(f"{distance}: {count}")
+        return
+
+    source = degrees.person_id_for_name(args.name)
+    if source is None:
+        sys.exit("Person not found.")
+    counts, _ = layer_counts(source)
+    for distance, count in enumerate(counts):
+        print(f"{distance}: {count}")
+    print(f"Not connected: {len(degrees.people) - sum(counts)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+"""
+Landmark distance index for the degrees graph.
+
+Breadth-first distances from a few well-connected people ("landmarks")
+bound the separation of any two people by the triangle inequality:
+
+    |d(L, s) - d(L, t)| <= d(s, t) <= d(L, s) + d(L, t)
+
+The index answers those bounds in microseconds and the lower bound
+guides an A* search for the exact path. It is built once, written next
+to the CSV files and rebuilt when they change. People and stars added
+to the loaded data later are folded into the distances in place.
+"""
+
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+
+import degrees
+import snapshot
+import weighted
+from util import SearchStats
+
+MAGIC = b"LANDMARK"
+VERSION = 1
+FILENAME = "degrees.landmarks"
+
+# Magic, format version and length of the JSON header that follows
+PREAMBLE = struct.Struct("<8sIQ")
+
+# Distance stored for people a landmark cannot reach
+UNREACHABLE = 0xFFFF
+
+
+class LandmarkIndex():
+    """
+    Distances from each landmark to every person, two bytes per person,
+    in the order people were loaded.
+    """
+
+    def __init__(self, landmarks, distances, positions):
+        self.landmarks = landmarks
+        self.distances = distances
+        self.positions = positions
+
+    def bounds(self, source, target):
+        """
+        Returns lower and upper bounds on the degrees of separation
+        between two people. Both are math.inf if the index proves they
+        are not connected; the upper bound is math.inf if no landmark
+        reaches them.
+        """
+        if source == target:
+            return 0, 0
+        s = self.positions[source]
+        t = self.positions[target]
+        lower = 1
+        upper = math.inf
+        for distance in self.distances:
+            ds = distance[s]
+            dt = distance[t]
+            if ds == UNREACHABLE and dt == UNREACHABLE:
+                continue
+            if ds == UNREACHABLE or dt == UNREACHABLE:
+                return math.inf, math.inf
+            lower = max(lower, abs(ds - dt))
+            upper = min(upper, ds + dt)
+        return lower, upper
+
+    def heuristic(self, target):
+        """
+        Returns a function giving a lower bound on the distance from
+        a person to the target, for guiding A* search.
+        """
+        t = self.positions[target]
+        columns = [
+            (distance, distance[t]) for distance in self.distances
+            if distance[t] != UNREACHABLE
+        ]
+
+        def estimate(person_id):
+            p = self.positions[person_id]
+            lower = 0
+            for distance, dt in columns:
+                dp = distance[p]
+                if dp == UNREACHABLE:
+                    return math.inf
+                lower = max(lower, abs(dp - dt))
+            return lower
+        return estimate
+
+    def watch(self):
+        """Keeps the distances exact as people and stars are added."""
+        degrees.update_hooks.append(self.update)
+
+    def update(self, kind, key):
+        """
+        Update hook. New people start unreachable; a new star can only
+        shorten distances, so they are lowered outward from its movie.
+        """
+        if kind == "movie":
+            return
+
+        # Copy distances out of a read-only mapped file before writing
+        for k, distance in enumerate(self.distances):
+            if not isinstance(distance, array):
+                self.distances[k] = array("H")
+                self.distances[k].frombytes(distance.tobytes())
+
+        if kind == "person":
+            if degrees.graph is not None:
+                self.positions = degrees.graph.person_index
+            else:
+                self.positions[key] = len(degrees.people) - 1
+            for distance in self.distances:
+                distance.append(UNREACHABLE)
+            return
+
+        # Work on integer indices when the graph has them
+        _, movie_id = key
+        graph = degrees.graph
+        if graph is not None:
+            stars = list(graph.stars_for(graph.movie_index[movie_id]))
+
+            def position(i):
+                return i
+
+            def neighbors(i):
+                return [j for m in graph.movies_for(i)
+                        for j in graph.stars_for(m)]
+        else:
+            stars = list(degrees.movies[movie_id]["stars"])
+            position = self.positions.__getitem__
+
+            def neighbors(person_id):
+                return [neighbor_id for _, neighbor_id
+                        in degrees.neighbors_for_person(person_id)]
+
+        for distance in self.distances:
+            nearest = min(distance[position(star)] for star in stars)
+            if nearest == UNREACHABLE:
+                continue
+
+            # Lower the movie's stars, then breadth-first from them
+            layer = []
+            for star in stars:
+                if distance[position(star)] > nearest + 1:
+                    distance[position(star)] = nearest + 1
+                    layer.append(star)
+            while layer:
+                next_layer = []
+                for node in layer:
+                    depth = distance[position(node)] + 1
+                    for neighbor in neighbors(node):
+                        if distance[position(neighbor)] > depth:
+                            distance[position(neighbor)] = depth
+                            next_layer.append(neighbor)
+                layer = next_layer
+
+
+def positions():
+    """Returns a mapping from person_id to its position in load order."""
+    if degrees.graph is not None:
+        return degrees.graph.person_index
+    return {person_id: i for i, person_id in enumerate(degrees.people)}
+
+
+def distances_from(source, positions):
+    """
+    Returns the breadth-first distance from a person to every person,
+    as an unsigned 16-bit array in load order.
+    """
+    distance = array("H", [UNREACHABLE]) * len(degrees.people)
+    graph = degrees.graph
+    if graph is not None:
+        expanded = bytearray(len(graph.movie_ids))
+        layer = [positions[source]]
+        distance[layer[0]] = 0
+        depth = 0
+        while layer:
+            depth += 1
+            next_layer = []
+            for i in layer:
+                for m in graph.movies_for(i):
+                    if expanded[m]:
+                        continue
+                    expanded[m] = 1
+                    for j in graph.stars_for(m):
+                        if distance[j] == UNREACHABLE:
+                            distance[j] = depth
+                            next_layer.append(j)
+            layer = next_layer
+        return distance
+
+    expanded = set()
+    layer = [source]
+    distance[positions[source]] = 0
+    depth = 0
+    while layer:
+        depth += 1
+        next_layer = []
+        for person_id in layer:
+            for movie_id in degrees.people[person_id]["movies"]:
+                if movie_id in expanded:
+                    continue
+                expanded.add(movie_id)
+                for star_id in degrees.movies[movie_id]["stars"]:
+                    j = positions[star_id]
+                    if distance[j] == UNREACHABLE:
+                        distance[j] = depth
+                        next_layer.append(star_id)
+        layer = next_layer
+    return distance
+
+
+def costar_count(person_id):
+    """Returns how many co-star slots a person has, counting repeats."""
+    graph = degrees.graph
+    if graph is not None:
+        return sum(len(graph.stars_for(m))
+                   for m in graph.movies_for(graph.person_index[person_id]))
+    return sum(len(degrees.movies[movie_id]["stars"])
+               for movie_id in degrees.people[person_id]["movies"])
+
+
+def build(k=16):
+    """
+    Builds an index from the k people with the most co-stars, skipping
+    anyone already within one degree of a chosen landmark so the
+    landmarks spread over the graph.
+    """
+    index = positions()
+    candidates = sorted(degrees.people, key=costar_count, reverse=True)
+    landmarks = []
+    distances = []
+    for person_id in candidates:
+        if len(landmarks) == k:
+            break
+        i = index[person_id]
+        if any(distance[i] <= 1 for distance in distances):
+            continue
+        landmarks.append(person_id)
+        distances.append(distances_from(person_id, index))
+    return LandmarkIndex(landmarks, distances, index)
+
+
+def save(directory, index):
+    """Writes a landmark index next to the CSV files in a directory."""
+    header = snapshot.encode_header({
+        "byteorder": sys.byteorder,
+        "sources": snapshot.fingerprint(directory),
+        "people": len(degrees.people),
+        "landmarks": index.landmarks
+    }, 2)
+    path = os.path.join(directory, FILENAME)
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(PREAMBLE.pack(MAGIC, VERSION, len(header)))
+        f.write(header)
+        for distance in index.distances:
+            f.write(array("H", distance).tobytes())
+    os.replace(temporary, path)
+
+
+def load(directory):
+    """
+    Memory-maps the landmark index in a directory. Returns None if
+    there is none, it was written by another format version, or the CSV
+    files changed since it was built.
+    """
+    path = os.path.join(directory, FILENAME)
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    if len(buffer) < PREAMBLE.size:
+        return None
+    magic, version, length = PREAMBLE.unpack_from(buffer)
+    if magic != MAGIC or version != VERSION:
+        return None
+    try:
+        header = json.loads(
+            bytes(buffer[PREAMBLE.size:PREAMBLE.size + length])
+        )
+        if (header["byteorder"] != sys.byteorder
+                or header["people"] != len(degrees.people)):
+            return None
+        sources = snapshot.current_sources(directory, header["sources"])
+        if sources is None:
+            return None
+    except (OSError, KeyError, ValueError):
+        return None
+
+    # Records the new mtimes of CSV files that were only touched
+    if sources is not header["sources"]:
+        header["sources"] = sources
+        snapshot.rewrite_header(path, header, length)
+
+    n = header["people"]
+    data = memoryview(buffer)[PREAMBLE.size + length:]
+    distances = [
+        data[2 * i * n:2 * (i + 1) * n].cast("H")
+        for i in range(len(header["landmarks"]))
+    ]
+    return LandmarkIndex(header["landmarks"], distances, positions())
+
+
+def load_or_build(directory, k=16):
+    """
+    Returns the landmark index for the loaded data, building and saving
+    it first if it is missing or out of date, and keeps it up to date
+    with later changes.
+    """
+    index = load(directory)
+    if index is None or len(index.landmarks) < k:
+        index = build(k)
+        try:
+            save(directory, index)
+        except OSError:
+            pass
+    index.watch()
+    return index
+
+
+def shortest_path(source, target, index):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, using A* search guided
+    by the landmark lower bound and pruned by the upper bound.
+
+    If no possible path, returns None.
+    """
+    lower, upper = index.bounds(source, target)
+    if lower == math.inf:
+        return SearchStats("landmarks", source, target).finish(
+            None, degrees.search_hooks
+        )
+    return weighted.best_first_search(
+        source, target, heuristic=index.heuristic(target), bound=upper,
+        strategy="landmarks"
+    )
+
+
+def main():
+    if len(sys.argv) not in [2, 3]:
+        sys.exit("Usage: python landmarks.py directory [k]")
+    directory = sys.argv[1]
+    k = int(sys.argv[2]) if len(sys.argv) == 3 else 16
+
+    print("Loading data...")
+    degrees.use_snapshot(directory)
+    start = time.perf_counter()
+    index = load_or_build(directory, k)
+    print(f"Index ready with {len(index.landmarks)} landmarks "
+          f"in {time.perf_counter() - start:.2f}s.")
+
+    source = degrees.person_id_for_name(input("Name: "))
+    if source is None:
+        sys.exit("Person not found.")
+    target = degrees.person_id_for_name(input("Name: "))
+    if target is None:
+        sys.exit("Person not found.")
+
+    start = time.perf_counter()
+    lower, upper = index.bounds(source, target)
+    elapsed = time.perf_counter() - start
+    print(f"Between {lower} and {upper} degrees of separation "
+          f"({elapsed * 1e6:.0f} microseconds).")
+
+    start = time.perf_counter()
+    path = shortest_path(source, target, index)
+    elapsed = time.perf_counter() - start
+    if path is None:
+        print("Not connected.")
+    else:
+        print(f"{len(path)} degrees of separation ({elapsed * 1000:.1f} ms).")
+
+
+if __name__ == "__main__":
+    main()
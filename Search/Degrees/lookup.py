@@ -0,0 +1,211 @@
+"""
+Prefix and fuzzy name lookup for the degrees data.
+
+Lowercase names are kept sorted, so every name with a given prefix is
+one binary search away. Misspelt names are matched through an inverted
+index of character trigrams, built the first time it is needed. None of
+the lookups ever ask on stdin, so batch and server code can use them.
+The shared index follows people added through degrees.add_person.
+"""
+
+import heapq
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+import degrees
+
+# Postings read before fuzzy matching stops adding candidates
+CANDIDATE_BUDGET = 5000
+
+
+def trigrams(name):
+    """Returns the set of character trigrams of a padded lowercase name."""
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex():
+    """Sorted and trigram indexes over the lowercase names in `names`."""
+
+    def __init__(self, names):
+        self.names = names
+        self.keys = sorted(names)
+        # Keys in the order trigram postings refer to them
+        self.indexed = self.keys
+        self.sizes = None
+        self.postings = None
+
+    def prefix(self, text, limit=10):
+        """Returns up to limit lowercase names starting with text."""
+        text = text.lower()
+        i = bisect_left(self.keys, text)
+        matches = []
+        while (i < len(self.keys) and len(matches) < limit
+               and self.keys[i].startswith(text)):
+            matches.append(self.keys[i])
+            i += 1
+        return matches
+
+    def build_trigrams(self):
+        """Builds the trigram postings, mapping trigrams to key positions."""
+        self.indexed = self.keys
+        self.sizes = array("H")
+        self.postings = {}
+        for i, key in enumerate(self.keys):
+            self.index_trigrams(i, key)
+
+    def index_trigrams(self, i, key):
+        """Adds the trigrams of the key at position i to the postings."""
+        key_trigrams = trigrams(key)
+        self.sizes.append(min(len(key_trigrams), 0xFFFF))
+        for trigram in key_trigrams:
+            if trigram not in self.postings:
+                self.postings[trigram] = array("i")
+            self.postings[trigram].append(i)
+
+    def add(self, key):
+        """
+        Indexes a lowercase name added to `names` since the index was
+        built. New names go at the end of the trigram postings, so the
+        positions already in them stay valid.
+        """
+        i = bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            return
+        if self.postings is not None:
+            if self.indexed is self.keys:
+                self.indexed = list(self.keys)
+            self.indexed.append(key)
+            self.index_trigrams(len(self.indexed) - 1, key)
+        self.keys.insert(i, key)
+
+    def fuzzy(self, text, limit=10):
+        """
+        Returns up to limit lowercase names most similar to text,
+        ranked by the Dice coefficient of their trigram sets.
+        """
+        if self.postings is None:
+            self.build_trigrams()
+        wanted = trigrams(text.lower())
+
+        # Read the rarest trigrams first and skip any too common to help
+        shared = Counter()
+        read = 0
+        for trigram in sorted(wanted,
+                              key=lambda t: len(self.postings.get(t, ()))):
+            posting = self.postings.get(trigram, ())
+            if read + len(posting) > CANDIDATE_BUDGET:
+                break
+            shared.update(posting)
+            read += len(posting)
+
+        best = heapq.nlargest(
+            limit, shared.items(),
+            key=lambda item: 2 * item[1] / (len(wanted) + self.sizes[item[0]])
+        )
+        return [self.indexed[i] for i, _ in best]
+
+    def candidates(self, name, birth=None):
+        """
+        Returns the person_ids with exactly this name, optionally only
+        those born in a given year, most prolific first.
+        """
+        person_ids = self.names.get(name.lower(), set())
+        if birth is not None:
+            person_ids = [
+                person_id for person_id in person_ids
+                if degrees.people[person_id]["birth"] == str(birth)
+            ]
+        return sorted(person_ids, key=rank)
+
+    def suggest(self, text, limit=10):
+        """
+        Returns up to limit (person_id, name, birth) suggestions for text:
+        exact matches first, then names it is a prefix of, then similar
+        names.
+        """
+        keys = [text.lower()] + self.prefix(text, limit)
+        if len(keys) <= limit:
+            keys += self.fuzzy(text, limit)
+        suggestions = []
+        seen = set()
+        for key in keys:
+            for person_id in self.candidates(key):
+                if person_id in seen:
+                    continue
+                seen.add(person_id)
+                person = degrees.people[person_id]
+                suggestions.append((person_id, person["name"],
+                                    person["birth"]))
+                if len(suggestions) == limit:
+                    return suggestions
+        return suggestions
+
+    def resolve(self, name, birth=None):
+        """
+        Returns the best person_id for a name or person_id without asking:
+        the one in the most movies, optionally born in a given year.
+        Returns None if no one matches.
+        """
+        if name in degrees.people:
+            return name
+        person_ids = self.candidates(name, birth)
+        return person_ids[0] if person_ids else None
+
+
+def rank(person_id):
+    """Sort key putting people in more movies first, then by ID."""
+    graph = degrees.graph
+    if graph is not None:
+        return -len(graph.movies_for(graph.person_index[person_id])), person_id
+    return -len(degrees.people[person_id]["movies"]), person_id
+
+
+# Index over the names table it was built for, shared by callers
+shared_index = None
+
+
+def index():
+    """Returns a name index over the currently loaded names."""
+    global shared_index
+    if shared_index is None or shared_index.names is not degrees.names:
+        shared_index = NameIndex(degrees.names)
+    return shared_index
+
+
+def follow(kind, key):
+    """Update hook keeping the shared index in step with new people."""
+    if kind == "person" and shared_index is not None:
+        shared_index.add(degrees.people[key]["name"].lower())
+
+
+degrees.update_hooks.append(follow)
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python lookup.py directory")
+    degrees.use_snapshot(sys.argv[1])
+    start = time.perf_counter()
+    names = index()
+    names.build_trigrams()
+    print(f"Indexed {len(names.keys)} names "
+          f"in {time.perf_counter() - start:.2f}s.")
+    while True:
+        try:
+            text = input("Name: ")
+        except EOFError:
+            break
+        start = time.perf_counter()
+        suggestions = names.suggest(text)
+        elapsed = time.perf_counter() - start
+        for person_id, name, birth in suggestions:
+            print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
+        print(f"({elapsed * 1000:.2f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Every shortest path between two people in the degrees graph.
+
+One bidirectional breadth-first sweep labels people with their distance
+from the source and from the target and finds the layer where the two
+searches meet. Every shortest path crosses that layer exactly once, so
+paths are generated lazily by walking the distance labels back to each
+end. No predecessor lists are stored: memory is the two distance maps
+plus one path per generator frame, however many paths there are.
+"""
+
+import itertools
+import sys
+
+import degrees
+
+
+def meeting_layer(source, target):
+    """
+    Labels people with their distance from the source and from the
+    target until the searches meet. Returns the two distance maps and
+    the people at which shortest paths cross between them, or None if
+    the source and the target are not connected.
+    """
+    forward = {source: 0}
+    backward = {target: 0}
+    forward_layer = [source]
+    backward_layer = [target]
+    while forward_layer and backward_layer:
+
+        # Expand a whole layer of the smaller side
+        if len(forward_layer) <= len(backward_layer):
+            layer, reached, other = forward_layer, forward, backward
+        else:
+            layer, reached, other = backward_layer, backward, forward
+        depth = reached[layer[0]] + 1
+        next_layer = []
+        meeting = []
+        for person_id in layer:
+            for _, neighbor_id in degrees.neighbors_for_person(person_id):
+                if neighbor_id in reached:
+                    continue
+                reached[neighbor_id] = depth
+                next_layer.append(neighbor_id)
+                if neighbor_id in other:
+                    meeting.append(neighbor_id)
+
+        if meeting:
+            return forward, backward, meeting
+        if reached is forward:
+            forward_layer = next_layer
+        else:
+            backward_layer = next_layer
+    return None
+
+
+def paths_to(person_id, distance):
+    """
+    Yields every shortest list of (movie_id, person_id) pairs from the
+    person at distance 0 to a labelled person.
+    """
+    if distance[person_id] == 0:
+        yield []
+        return
+    previous = distance[person_id] - 1
+    for movie_id, neighbor_id in sorted(
+        degrees.neighbors_for_person(person_id)
+    ):
+        if distance.get(neighbor_id) == previous:
+            for path in paths_to(neighbor_id, distance):
+                path.append((movie_id, person_id))
+                yield path
+
+
+def reverse_path(path, end):
+    """
+    Reverses a list of (movie_id, person_id) pairs that starts next to
+    `end`, so it leads from its last person back to `end`.
+    """
+    people = [person_id for _, person_id in path]
+    people = [end] + people[:-1]
+    return [(movie_id, person_id)
+            for (movie_id, _), person_id in zip(reversed(path),
+                                                reversed(people))]
+
+
+def shortest_paths(source, target, limit=None):
+    """
+    Yields every shortest list of (movie_id, person_id) pairs that
+    connects the source to the target, at most limit of them.
+    Yields nothing if they are not connected.
+    """
+    if source == target:
+        yield []
+        return
+    found = meeting_layer(source, target)
+    if found is None:
+        return
+    forward, backward, meeting = found
+
+    def generate():
+        for person_id in sorted(meeting):
+            for prefix in paths_to(person_id, forward):
+                for suffix in paths_to(person_id, backward):
+                    yield prefix + reverse_path(suffix, target)
+
+    yield from itertools.islice(generate(), limit)
+
+
+def count_shortest_paths(source, target):
+    """
+    Returns the number of shortest paths between two people, counting
+    each (movie, person) chain once, without generating them.
+    """
+    if source == target:
+        return 1
+    found = meeting_layer(source, target)
+    if found is None:
+        return 0
+    forward, backward, meeting = found
+
+    def counter(distance):
+        counts = {}
+
+        def count(person_id):
+            if distance[person_id] == 0:
+                return 1
+            if person_id not in counts:
+                previous = distance[person_id] - 1
+                counts[person_id] = sum(
+                    count(neighbor_id)
+                    for _, neighbor_id in degrees.neighbors_for_person(
+                        person_id
+                    )
+                    if distance.get(neighbor_id) == previous
+                )
+            return counts[person_id]
+        return count
+
+    count_forward = counter(forward)
+    count_backward = counter(backward)
+    return sum(count_forward(person_id) * count_backward(person_id)
+               for person_id in meeting)
+
+
+def main():
+    if len(sys.argv) not in [2, 3]:
+        sys.exit("Usage: python paths.py directory [limit]")
+    directory = sys.argv[1]
+    limit = int(sys.argv[2]) if len(sys.argv) == 3 else 10
+
+    print("Loading data...")
+    degrees.use_snapshot(directory)
+    print("Data loaded.")
+
+    source = degrees.person_id_for_name(input("Name: "))
+    if source is None:
+        sys.exit("Person not found.")
+    target = degrees.person_id_for_name(input("Name: "))
+    if target is None:
+        sys.exit("Person not found.")
+
+    total = count_shortest_paths(source, target)
+    if total == 0:
+        sys.exit("Not connected.")
+    print(f"{total} shortest paths; showing up to {limit}.")
+    for number, path in enumerate(shortest_paths(source, target, limit), 1):
+        chain = [degrees.people[source]["name"]]
+        for movie_id, person_id in path:
+            chain.append(f"({degrees.movies[movie_id]['title']})")
+            chain.append(degrees.people[person_id]["name"])
+        print(f"{number}: {' '.join(chain)}")
+
+
+if __name__ == "__main__":
+    main()
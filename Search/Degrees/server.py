@@ -0,0 +1,271 @@
+"""
+Batch and server query mode for degrees of separation.
+
+Loads the data once and answers many source/target pairs, read from a
+CSV file, from stdin as JSON lines, or from a local socket as JSON lines.
+Queries are spread over a process pool; forked workers share the loaded
+graph copy-on-write. Each answer is written back as a JSON line with
+the time the search took.
+
+A line {"update": "delta_directory"} adds the people, movies and stars
+in that directory to the loaded data without reloading it. Queries
+after it see the new data, on every socket connection; the workers are
+restarted from the updated process, which is much cheaper than loading
+again. The socket server starts its workers from a fork server rather
+than forking its own threaded process, which could copy a lock another
+thread holds; they map the snapshot and apply the deltas themselves.
+The other modes fork only while their one reading thread is paused at
+the update.
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import queue
+import socketserver
+import sys
+import threading
+import time
+
+import degrees
+import lookup
+
+# Queries read ahead of their answers, per caller
+READ_AHEAD = 10000
+
+
+def resolve(name, birth=None):
+    """
+    Returns the person_id for a name or person_id without asking on
+    stdin, preferring the person in the most movies when a name is
+    shared. Raises ValueError with suggestions if no one matches.
+    """
+    names = lookup.index()
+    person_id = names.resolve(name, birth)
+    if person_id is None:
+        suggestions = ", ".join(
+            f"{suggestion} ({person_id})"
+            for person_id, suggestion, _ in names.suggest(name, 5)
+        )
+        raise ValueError(f"person not found: {name}; did you mean: "
+                         f"{suggestions}")
+    return person_id
+
+
+def answer(query):
+    """
+    Answers one query, a dict with "source" and "target" names or
+    person_ids and optional "source_birth" and "target_birth" years to
+    tell people with the same name apart, and returns the result as a
+    JSON-serializable dict.
+    """
+    result = {
+        "source": query.get("source"),
+        "target": query.get("target")
+    }
+    if "id" in query:
+        result["id"] = query["id"]
+    start = time.perf_counter()
+    try:
+        source = resolve(query["source"], query.get("source_birth"))
+        target = resolve(query["target"], query.get("target_birth"))
+        path = degrees.bidirectional_shortest_path(source, target)
+    except (KeyError, TypeError, ValueError) as e:
+        result["error"] = str(e)
+        path = None
+    else:
+        result["degrees"] = None if path is None else len(path)
+        result["path"] = path
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def parse_line(line):
+    """Parses a JSON line into a query dict, or an error dict."""
+    try:
+        query = json.loads(line)
+    except ValueError as e:
+        return {"error": f"invalid JSON: {e}"}
+    if not isinstance(query, dict):
+        return {"error": "query must be a JSON object"}
+    return query
+
+
+def answer_or_error(query):
+    """Answers a parsed query, passing parse errors straight through."""
+    if "error" in query:
+        return query
+    return answer(query)
+
+
+def read_file(path):
+    """Yields queries from a CSV file with source and target columns."""
+    with open(path, encoding="utf-8") as f:
+        for number, row in enumerate(csv.reader(f), 1):
+            if len(row) != 2:
+                continue
+            if number == 1 and row == ["source", "target"]:
+                continue
+            yield {"id": number, "source": row[0], "target": row[1]}
+
+
+def read_lines(lines):
+    """Yields parsed queries from JSON lines, skipping blank lines."""
+    for line in lines:
+        if line.strip():
+            yield parse_line(line)
+
+
+class QueryPool():
+    """
+    Process pool answering queries, restarted after each data update so
+    its workers see the new data.
+    """
+
+    def __init__(self, directory, processes, start_method=None):
+        self.directory = directory
+        self.processes = processes
+        self.start_method = start_method
+        self.lock = threading.Lock()
+        self.pool = degrees.create_pool(directory, processes, start_method)
+
+    def answer_all(self, queries):
+        """
+        Yields the answers to queries in order, applying each update
+        once every query before it has been answered.
+
+        A thread of its own reads the queries and hands each to the pool
+        as it arrives, so no caller waiting on its input holds up the
+        pool for the others, and every query read after an update, from
+        any caller, goes to the restarted pool.
+        """
+        submitted = queue.Queue(READ_AHEAD)
+        resume = threading.Event()
+
+        def read():
+            try:
+                for query in queries:
+                    if "update" in query:
+                        # Reads no further until the update is applied
+                        resume.clear()
+                        submitted.put(("update", query["update"]))
+                        resume.wait()
+                        continue
+                    with self.lock:
+                        answer = self.pool.apply_async(answer_or_error,
+                                                       (query,))
+                    submitted.put(("answer", answer))
+            except Exception as e:
+                submitted.put(("error", e))
+            submitted.put(("end", None))
+
+        threading.Thread(target=read, daemon=True).start()
+        while True:
+            kind, item = submitted.get()
+            if kind == "answer":
+                yield item.get()
+            elif kind == "update":
+                result = self.update(item)
+                resume.set()
+                yield result
+            elif kind == "error":
+                raise item
+            else:
+                return
+
+    def update(self, delta):
+        """Applies a delta directory and restarts the workers."""
+        result = {"update": delta}
+        start = time.perf_counter()
+        with self.lock:
+            try:
+                result["skipped"] = degrees.apply_delta(delta)
+            except (OSError, ValueError) as e:
+                result["error"] = str(e)
+            else:
+                # Queries already sent to the old workers still finish
+                old = self.pool
+                self.pool = degrees.create_pool(self.directory,
+                                                self.processes,
+                                                self.start_method)
+                old.close()
+                threading.Thread(target=old.join, daemon=True).start()
+        result["seconds"] = time.perf_counter() - start
+        return result
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+
+class QueryHandler(socketserver.StreamRequestHandler):
+    """Answers JSON-line queries on one socket connection."""
+
+    def handle(self):
+        lines = (line.decode("utf-8") for line in self.rfile)
+        for result in self.server.pool.answer_all(read_lines(lines)):
+            self.wfile.write(json.dumps(result).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class QueryServer(socketserver.ThreadingTCPServer):
+    """Local TCP server that shares one process pool among connections."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, pool):
+        super().__init__(address, QueryHandler)
+        self.pool = pool
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Answer many degrees of separation queries at once."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--file", help="CSV file of source,target pairs")
+    source.add_argument("--stdin", action="store_true",
+                        help="read JSON lines from stdin")
+    source.add_argument("--socket", type=int, metavar="PORT",
+                        help="serve JSON lines on a local port")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="worker processes (default: one per core)")
+    args = parser.parse_args()
+
+    # Load data once, before the workers are started
+    print("Loading data...", file=sys.stderr)
+    degrees.use_snapshot(args.directory)
+    lookup.index().build_trigrams()
+    print("Data loaded.", file=sys.stderr)
+
+    # Forking the threaded socket server could copy a held lock
+    start_method = None
+    if args.socket is not None:
+        methods = multiprocessing.get_all_start_methods()
+        start_method = "forkserver" if "forkserver" in methods else "spawn"
+    pool = QueryPool(args.directory, args.processes, start_method)
+    try:
+        if args.socket is not None:
+            with QueryServer(("127.0.0.1", args.socket), pool) as server:
+                print(f"Serving on 127.0.0.1:{args.socket}", file=sys.stderr)
+                try:
+                    server.serve_forever()
+                except KeyboardInterrupt:
+                    pass
+            return
+
+        if args.file is not None:
+            queries = read_file(args.file)
+        else:
+            queries = read_lines(sys.stdin)
+        for result in pool.answer_all(queries):
+            print(json.dumps(result), flush=True)
+    finally:
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+"""
+Binary snapshot cache for the degrees data.
+
+The compact graph is written to a single versioned file next to the CSV
+files and memory-mapped on later runs, so a warm start reads no CSV at
+all. The snapshot records the size, mtime and hash of each CSV file and
+is rebuilt when they no longer match.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping, Sequence
+
+from compact import CompactGraph
+
+MAGIC = b"DEGREES\0"
+VERSION = 1
+FILENAME = "degrees.snapshot"
+SOURCES = ["people.csv", "movies.csv", "stars.csv"]
+
+# Magic, format version and length of the JSON header that follows
+PREAMBLE = struct.Struct("<8sIQ")
+
+# Spare bytes after each JSON header, so it can be rewritten in place
+HEADER_SLACK = 64
+
+# String tables stored in the snapshot, by CompactGraph attribute
+STRING_TABLES = [
+    "person_ids", "person_names", "person_births",
+    "movie_ids", "movie_titles", "movie_years"
+]
+
+# Integer arrays stored in the snapshot, by CompactGraph attribute
+ARRAYS = ["person_offsets", "person_movies", "movie_offsets", "movie_stars"]
+
+
+class StringTable(Sequence):
+    """Strings stored as one UTF-8 blob plus an offset array."""
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __getitem__(self, i):
+        if not 0 <= i < len(self):
+            raise IndexError("string table index out of range")
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+
+class SortedIndex(Mapping):
+    """
+    Maps keys of a string table to their positions, by binary search
+    over a permutation that sorts the table.
+    """
+
+    def __init__(self, keys, order):
+        self.keys = keys
+        self.order = order
+
+    def __getitem__(self, key):
+        i = bisect_left(self.order, key, key=self.keys.__getitem__)
+        if i < len(self.order) and self.keys[self.order[i]] == key:
+            return self.order[i]
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self.keys)
+
+    def __len__(self):
+        return len(self.keys)
+
+
+class NameIndex(Mapping):
+    """
+    Maps lowercase names to the person indices with that name,
+    by binary search over people sorted by lowercase name.
+    """
+
+    def __init__(self, names, order):
+        self.names = names
+        self.order = order
+
+    def lower_name(self, i):
+        return self.names[i].lower()
+
+    def __getitem__(self, name):
+        start = bisect_left(self.order, name, key=self.lower_name)
+        end = bisect_right(self.order, name, lo=start, key=self.lower_name)
+        if start == end:
+            raise KeyError(name)
+        return list(self.order[start:end])
+
+    def __iter__(self):
+        previous = None
+        for i in self.order:
+            name = self.lower_name(i)
+            if name != previous:
+                yield name
+                previous = name
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+def fingerprint(directory, hashes=True):
+    """
+    Returns the size, mtime and optionally SHA-256 of each CSV file.
+    """
+    sources = {}
+    for filename in SOURCES:
+        path = os.path.join(directory, filename)
+        stat = os.stat(path)
+        sources[filename] = {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+        if hashes:
+            digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+            sources[filename]["sha256"] = digest.hexdigest()
+    return sources
+
+
+def current_sources(directory, recorded):
+    """
+    Returns the fingerprint of the CSV files if they still match a
+    recorded one, or None if they changed. Files are only hashed when
+    their size or mtime changed; the result is the recorded fingerprint
+    itself unless a file was touched without changing, when it has the
+    new mtimes to record instead.
+    """
+    current = fingerprint(directory, hashes=False)
+    if all(
+        current[filename]["size"] == recorded[filename]["size"]
+        and current[filename]["mtime"] == recorded[filename]["mtime"]
+        for filename in SOURCES
+    ):
+        return recorded
+    current = fingerprint(directory)
+    if all(
+        current[filename]["size"] == recorded[filename]["size"]
+        and current[filename]["sha256"] == recorded[filename]["sha256"]
+        for filename in SOURCES
+    ):
+        return current
+    return None
+
+
+def is_current(directory, recorded):
+    """Checks whether the CSV files still match a recorded fingerprint."""
+    return current_sources(directory, recorded) is not None
+
+
+def encode_header(header, alignment):
+    """
+    Returns a JSON header padded with spaces, with room to grow, so the
+    data after it starts on a multiple of alignment.
+    """
+    encoded = json.dumps(header).encode("utf-8") + b" " * HEADER_SLACK
+    return encoded + b" " * (-(PREAMBLE.size + len(encoded)) % alignment)
+
+
+def rewrite_header(path, header, length):
+    """
+    Replaces the JSON header of a file in place, without moving the data
+    after it. Returns False, changing nothing, if the new header does
+    not fit in the old one's length or the file cannot be written.
+    """
+    encoded = json.dumps(header).encode("utf-8")
+    if len(encoded) > length:
+        return False
+    try:
+        with open(path, "r+b") as f:
+            f.seek(PREAMBLE.size)
+            f.write(encoded + b" " * (length - len(encoded)))
+    except OSError:
+        return False
+    return True
+
+
+def save(directory, graph):
+    """
+    Writes a compact graph to the snapshot file in a directory.
+    """
+    sections = {}
+    for name in STRING_TABLES:
+        strings = [s.encode("utf-8") for s in getattr(graph, name)]
+        offsets = array("q", [0])
+        total = 0
+        for s in strings:
+            total += len(s)
+            offsets.append(total)
+        sections[f"{name}.blob"] = array("B", b"".join(strings))
+        sections[f"{name}.offsets"] = offsets
+    for name, values in zip(ARRAYS, graph.csr_arrays()):
+        if isinstance(values, memoryview):
+            sections[name] = array(values.format, values)
+        else:
+            sections[name] = array(values.typecode, values)
+
+    # Permutations sorting IDs and lowercase names, for lookups by bisection
+    sections["person_order"] = array("i", sorted(
+        range(len(graph.person_ids)), key=graph.person_ids.__getitem__
+    ))
+    sections["movie_order"] = array("i", sorted(
+        range(len(graph.movie_ids)), key=graph.movie_ids.__getitem__
+    ))
+    sections["name_order"] = array("i", sorted(
+        range(len(graph.person_names)),
+        key=lambda i: graph.person_names[i].lower()
+    ))
+
+    # Lay the sections out one after another, aligned to 8 bytes
+    layout = {}
+    position = 0
+    for name, values in sections.items():
+        nbytes = len(values) * values.itemsize
+        layout[name] = [values.typecode, position, nbytes]
+        position += -(-nbytes // 8) * 8
+    header = encode_header({
+        "byteorder": sys.byteorder,
+        "sources": fingerprint(directory),
+        "sections": layout
+    }, 8)
+
+    # Write to a temporary file first so readers never see half a snapshot
+    path = os.path.join(directory, FILENAME)
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(PREAMBLE.pack(MAGIC, VERSION, len(header)))
+        f.write(header)
+        for name, values in sections.items():
+            data = values.tobytes()
+            f.write(data)
+            f.write(b"\0" * (-len(data) % 8))
+    os.replace(temporary, path)
+
+
+def load(directory):
+    """
+    Memory-maps the snapshot in a directory as a compact graph.
+
+    Returns None if there is no snapshot, it was written by another
+    format version, or the CSV files changed since it was written. If
+    the CSV files were only touched, their new mtimes are recorded so
+    later loads need not hash them again.
+    """
+    path = os.path.join(directory, FILENAME)
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    # Check the file belongs to this format and these CSV files
+    if len(buffer) < PREAMBLE.size:
+        return None
+    magic, version, length = PREAMBLE.unpack_from(buffer)
+    if magic != MAGIC or version != VERSION:
+        return None
+    try:
+        header = json.loads(
+            bytes(buffer[PREAMBLE.size:PREAMBLE.size + length])
+        )
+        if header["byteorder"] != sys.byteorder:
+            return None
+        sources = current_sources(directory, header["sources"])
+        if sources is None:
+            return None
+    except (OSError, KeyError, ValueError):
+        return None
+    touched = sources is not header["sources"]
+    if touched:
+        header["sources"] = sources
+        touched = not rewrite_header(path, header, length)
+
+    # Every section is a zero-copy view into the mapped file
+    data = memoryview(buffer)[PREAMBLE.size + length:]
+    sections = {}
+    for name, (typecode, offset, nbytes) in header["sections"].items():
+        sections[name] = data[offset:offset + nbytes].cast(typecode)
+
+    tables = {
+        name: StringTable(sections[f"{name}.blob"],
+                          sections[f"{name}.offsets"])
+        for name in STRING_TABLES
+    }
+    graph = CompactGraph(
+        tables["person_ids"], tables["person_names"],
+        tables["person_births"], tables["movie_ids"],
+        tables["movie_titles"], tables["movie_years"],
+        *[sections[name] for name in ARRAYS],
+        person_index=SortedIndex(tables["person_ids"],
+                                 sections["person_order"]),
+        movie_index=SortedIndex(tables["movie_ids"],
+                                sections["movie_order"]),
+        name_index=NameIndex(tables["person_names"], sections["name_order"])
+    )
+
+    # Writes the snapshot out again if its header had no room left
+    if touched:
+        try:
+            save(directory, graph)
+        except OSError:
+            pass
+    return graph
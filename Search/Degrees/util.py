@@ -1,3 +1,9 @@
+import heapq
+import itertools
+import time
+from collections import deque
+
+
 class Node():
     def __init__(self, state, parent, action):
         self.state = state
@@ -7,13 +13,16 @@ class Node():
 
 class StackFrontier():
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+        # Number of nodes in the frontier for each state
+        self.states = {}
 
     def add(self, node):
         self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
 
     def empty(self):
         return len(self.frontier) == 0
@@ -22,10 +31,18 @@ class StackFrontier():
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self.forget(node)
             return node
 
+    def forget(self, node):
+        """Drops a removed node from the state index."""
+        count = self.states[node.state] - 1
+        if count:
+            self.states[node.state] = count
+        else:
+            del self.states[node.state]
+
 
 class QueueFrontier(StackFrontier):
 
@@ -33,6 +50,55 @@ class QueueFrontier(StackFrontier):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
+            node = self.frontier.popleft()
+            self.forget(node)
             return node
+
+
+class PriorityFrontier(StackFrontier):
+    def __init__(self):
+        super().__init__()
+        self.frontier = []
+        # Breaks priority ties in insertion order
+        self.counter = itertools.count()
+
+    def add(self, node, priority=0):
+        heapq.heappush(self.frontier, (priority, next(self.counter), node))
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            _, _, node = heapq.heappop(self.frontier)
+            self.forget(node)
+            return node
+
+
+class SearchStats():
+    """
+    Counters for one search, handed to every hook when the search ends.
+    """
+
+    def __init__(self, strategy, source, target):
+        self.strategy = strategy
+        self.source = source
+        self.target = target
+        self.explored = 0
+        self.max_frontier = 0
+        self.degrees = None
+        self.seconds = None
+        self.start = time.perf_counter()
+
+    def frontier(self, size):
+        """Records the current frontier size."""
+        if size > self.max_frontier:
+            self.max_frontier = size
+
+    def finish(self, path, hooks):
+        """Stops the clock, runs the hooks and returns the path found."""
+        self.seconds = time.perf_counter() - self.start
+        self.degrees = None if path is None else len(path)
+        for hook in hooks:
+            hook(self)
+        return path
@@ -0,0 +1,229 @@
+"""
+Best-first and A* search over the degrees graph with pluggable costs.
+
+An edge is one (movie_id, person_id) step. A cost function prices a step
+as cost(movie_id, person_id, neighbor_id), returning math.inf to forbid
+it, and a heuristic gives a lower bound on the remaining cost from a
+person to the target. With no heuristic the search is uniform-cost
+(Dijkstra); heuristics must be consistent for the result to be cheapest.
+"""
+
+import argparse
+import datetime
+import math
+import sys
+import time
+
+import degrees
+from util import Node, PriorityFrontier, SearchStats
+
+
+def best_first_search(source, target, cost=None, heuristic=None,
+                      bound=math.inf, strategy="best-first"):
+    """
+    Returns the cheapest list of (movie_id, person_id) pairs
+    that connect the source to the target under a cost function,
+    hop count by default. Paths whose estimated cost exceeds bound
+    are never expanded.
+
+    If no possible path, returns None.
+    """
+    stats = SearchStats(strategy, source, target)
+    if source == target:
+        return stats.finish([], degrees.search_hooks)
+    if cost is None:
+        cost = hops
+    if heuristic is None:
+        heuristic = no_heuristic
+
+    # Frontier priorities are (f, -g), so deeper nodes win ties
+    best = {source: 0}
+    frontier = PriorityFrontier()
+    frontier.add(Node(state=source, parent=None, action=None),
+                 (heuristic(source), 0))
+    explored = set()
+
+    while not frontier.empty():
+        stats.frontier(len(frontier.frontier))
+        node = frontier.remove()
+
+        # Skip entries superseded by a cheaper way to the same person
+        if node.state in explored:
+            continue
+        explored.add(node.state)
+        stats.explored += 1
+
+        if node.state == target:
+            return stats.finish(path_from(node), degrees.search_hooks)
+
+        g = best[node.state]
+        for movie_id, person_id in degrees.neighbors_for_person(node.state):
+            if person_id in explored:
+                continue
+            step = cost(movie_id, node.state, person_id)
+            if step == math.inf:
+                continue
+            g_child = g + step
+            if g_child >= best.get(person_id, math.inf):
+                continue
+            f = g_child + heuristic(person_id)
+            if f > bound:
+                continue
+            best[person_id] = g_child
+            frontier.add(Node(state=person_id, parent=node, action=movie_id),
+                         (f, -g_child))
+
+    return stats.finish(None, degrees.search_hooks)
+
+
+def path_from(node):
+    """
+    Returns the list of (movie_id, person_id) pairs leading to a node.
+    """
+    path = []
+    while node.parent is not None:
+        path.append((node.action, node.state))
+        node = node.parent
+    path.reverse()
+    return path
+
+
+def path_cost(source, path, cost):
+    """Returns the total cost of a path from the source."""
+    total = 0
+    for movie_id, person_id in path:
+        total += cost(movie_id, source, person_id)
+        source = person_id
+    return total
+
+
+def no_heuristic(person_id):
+    """Heuristic that knows nothing, turning A* into uniform-cost search."""
+    return 0
+
+
+def hops(movie_id, person_id, neighbor_id):
+    """Every step costs one, so the cheapest path is the shortest."""
+    return 1
+
+
+def movie_year(movie_id):
+    """Returns the year of a movie, or None if it is unknown."""
+    year = degrees.movies[movie_id]["year"]
+    return int(year) if year.isdigit() else None
+
+
+def recency(now=None, unknown=100):
+    """
+    Returns a cost that prefers recent movies: one plus the age of the
+    movie in years, with unknown years counted as `unknown` years old.
+    """
+    if now is None:
+        now = datetime.date.today().year
+    ages = {}
+
+    def cost(movie_id, person_id, neighbor_id):
+        if movie_id not in ages:
+            year = movie_year(movie_id)
+            ages[movie_id] = unknown if year is None else max(now - year, 0)
+        return 1 + ages[movie_id]
+    return cost
+
+
+def popularity():
+    """
+    Returns a cost that prefers popular movies, using cast size as the
+    measure of popularity: a step through a movie costs one over its
+    number of stars.
+    """
+    prices = {}
+
+    def cost(movie_id, person_id, neighbor_id):
+        if movie_id not in prices:
+            prices[movie_id] = 1 / len(degrees.movies[movie_id]["stars"])
+        return prices[movie_id]
+    return cost
+
+
+def released_after(year, cost=None):
+    """
+    Returns a cost that forbids movies released before a year (and movies
+    with no known year) and otherwise prices steps like cost.
+    """
+    if cost is None:
+        cost = hops
+    allowed = {}
+
+    def restricted(movie_id, person_id, neighbor_id):
+        if movie_id not in allowed:
+            released = movie_year(movie_id)
+            allowed[movie_id] = released is not None and released >= year
+        if not allowed[movie_id]:
+            return math.inf
+        return cost(movie_id, person_id, neighbor_id)
+    return restricted
+
+
+def landmark_heuristic(index, target, minimum=1):
+    """
+    Returns an A* heuristic from a landmark index, for costs where every
+    step costs at least `minimum`.
+    """
+    estimate = index.heuristic(target)
+    return lambda person_id: minimum * estimate(person_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Cheapest connections under different cost models."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--cost", default="hops",
+                        choices=["hops", "recency", "popularity"])
+    parser.add_argument("--after", type=int, metavar="YEAR",
+                        help="avoid movies released before YEAR")
+    parser.add_argument("--landmarks", action="store_true",
+                        help="guide the search with the landmark index")
+    args = parser.parse_args()
+    import landmarks
+
+    print("Loading data...")
+    degrees.use_snapshot(args.directory)
+    print("Data loaded.")
+
+    source = degrees.person_id_for_name(input("Name: "))
+    if source is None:
+        sys.exit("Person not found.")
+    target = degrees.person_id_for_name(input("Name: "))
+    if target is None:
+        sys.exit("Person not found.")
+
+    cost = {"hops": hops, "recency": recency(), "popularity": popularity()}
+    cost = cost[args.cost]
+    if args.after is not None:
+        cost = released_after(args.after, cost)
+
+    # Every cost model charges at least one per step except popularity
+    heuristic = None
+    if args.landmarks and args.cost != "popularity":
+        index = landmarks.load_or_build(args.directory)
+        heuristic = landmark_heuristic(index, target)
+
+    start = time.perf_counter()
+    path = best_first_search(source, target, cost, heuristic)
+    elapsed = time.perf_counter() - start
+    if path is None:
+        sys.exit("Not connected.")
+    print(f"{len(path)} degrees of separation, "
+          f"cost {path_cost(source, path, cost):g} ({elapsed * 1000:.1f} ms).")
+    path = [(None, source)] + path
+    for i in range(len(path) - 1):
+        person1 = degrees.people[path[i][1]]["name"]
+        person2 = degrees.people[path[i + 1][1]]["name"]
+        movie = degrees.movies[path[i + 1][0]]
+        print(f"{i + 1}: {person1} and {person2} starred in "
+              f"{movie['title']} ({movie['year']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Headless self-play arena for the Tic Tac Toe players
+
+Every player is a move function: it takes a list of lists board, as in
+tictactoe.py, and returns the (i, j) cell to play. The minimax AI is one
+already; the condition_approach bots are wrapped by translating the
+board into the cell names ('a1' to 'c3') they keep their moves in.
+
+Each pairing plays both ways round across a process pool. The arena
+reports a win/draw/loss matrix and the latency percentiles of each
+player's moves, kept as log-scale histograms so millions of moves cost
+a few hundred counters.
+"""
+
+import argparse
+import collections
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+import bitboard
+import tictactoe as ttt
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "condition_approach"))
+import tictactoe1  # noqa: E402
+import tictactoe2  # noqa: E402
+import tictactoe3  # noqa: E402
+
+# Cell names of the condition_approach bots, in the order they list them:
+# the letter is the column and the digit the row
+CELL_NAMES = ["a1", "a2", "a3", "b1", "b2", "b3", "c1", "c2", "c3"]
+
+# Latency histogram buckets per doubling of time
+BUCKETS_PER_OCTAVE = 8
+
+# Games handed to a worker at a time
+CHUNK = 10000
+
+
+def cell_action(name):
+    """Returns the (i, j) cell of a condition_approach name."""
+    return int(name[1]) - 1, "abc".index(name[0])
+
+
+def condition_bot(module):
+    """
+    Returns a move function for a condition_approach script, which
+    treats its opponent's stones as the player's and its own as the PC's.
+    The scripts were written to move second; if their rules pick a taken
+    cell when they move first, they fall back on a random free cell, as
+    their last rule does.
+    """
+    def move(board):
+        stones = [cell for row in board for cell in row]
+        mine = ttt.X if stones.count(ttt.X) == stones.count(ttt.O) else ttt.O
+        me, PC, cells = [], [], []
+        for name in CELL_NAMES:
+            i, j = cell_action(name)
+            if board[i][j] == ttt.EMPTY:
+                cells.append(name)
+            elif board[i][j] == mine:
+                PC.append(name)
+            else:
+                me.append(name)
+        name = module.choose_move(me, PC, cells)
+        if name not in cells:
+            name = random.choice(cells)
+        return cell_action(name)
+    return move
+
+
+# Every player the arena knows, by name
+PLAYERS = {
+    "minimax": ttt.minimax,
+    "random": condition_bot(tictactoe1),
+    "rules": condition_bot(tictactoe2),
+    "more-rules": condition_bot(tictactoe3)
+}
+
+
+def bucket(nanoseconds):
+    """Returns the log-scale histogram bucket of a latency."""
+    return int(BUCKETS_PER_OCTAVE * math.log2(max(nanoseconds, 1)))
+
+
+def bucket_floor(index):
+    """Returns the smallest latency, in nanoseconds, in a bucket."""
+    return 2 ** (index / BUCKETS_PER_OCTAVE)
+
+
+def play(x_move, o_move, latencies):
+    """
+    Plays one game and returns its winner, X, O or None for a tie,
+    adding the time of every move to the latency histograms.
+    """
+    board = ttt.initial_state()
+    state = bitboard.initial_state()
+    movers = {ttt.X: (x_move, latencies[0]), ttt.O: (o_move, latencies[1])}
+    while not bitboard.terminal(state):
+        player = bitboard.player(state)
+        move, histogram = movers[player]
+        start = time.perf_counter_ns()
+        action = move(board)
+        histogram[bucket(time.perf_counter_ns() - start)] += 1
+        state = bitboard.result(state, action)
+        board[action[0]][action[1]] = player
+    return bitboard.winner(state)
+
+
+def play_chunk(task):
+    """
+    Plays a chunk of games between two named players in a worker.
+    Returns (x wins, draws, o wins) and the latency histograms of the
+    X and the O player.
+    """
+    x_name, o_name, games, seed = task
+    random.seed(seed)
+    latencies = (collections.Counter(), collections.Counter())
+    outcomes = collections.Counter()
+    for _ in range(games):
+        outcomes[play(PLAYERS[x_name], PLAYERS[o_name], latencies)] += 1
+    return (x_name, o_name,
+            (outcomes[ttt.X], outcomes[None], outcomes[ttt.O]), latencies)
+
+
+def percentile(histogram, fraction):
+    """
+    Returns the latency, in nanoseconds, below which a fraction of the
+    moves in a histogram fall, to the resolution of its buckets.
+    """
+    total = sum(histogram.values())
+    seen = 0
+    for index in sorted(histogram):
+        seen += histogram[index]
+        if seen >= fraction * total:
+            return bucket_floor(index + 1)
+    return 0
+
+
+def run(names, games, processes=None, seed=0):
+    """
+    Plays `games` games for every ordered pair of players, the first
+    as X. Returns results[(x, o)] = [x wins, draws, o wins] and each
+    player's latency histogram.
+    """
+    tasks = []
+    for x_name in names:
+        for o_name in names:
+            for start in range(0, games, CHUNK):
+                tasks.append((x_name, o_name, min(CHUNK, games - start),
+                              seed + len(tasks)))
+
+    results = {(x, o): [0, 0, 0] for x in names for o in names}
+    latencies = {name: collections.Counter() for name in names}
+    with multiprocessing.Pool(processes) as pool:
+        for x_name, o_name, outcome, (x_times, o_times) in (
+            pool.imap_unordered(play_chunk, tasks)
+        ):
+            for k in range(3):
+                results[(x_name, o_name)][k] += outcome[k]
+            latencies[x_name].update(x_times)
+            latencies[o_name].update(o_times)
+    return results, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Play the Tic Tac Toe players against each other."
+    )
+    parser.add_argument("--games", type=int, default=10000,
+                        help="games per ordered pair of players")
+    parser.add_argument("--player", action="append", choices=list(PLAYERS),
+                        help="player to include (default: all)")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="worker processes (default: one per core)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    names = args.player or list(PLAYERS)
+
+    start = time.perf_counter()
+    results, latencies = run(names, args.games, args.processes, args.seed)
+    elapsed = time.perf_counter() - start
+    total = args.games * len(names) ** 2
+    print(f"{total:,} games in {elapsed:.1f}s "
+          f"({total / elapsed:,.0f} games/s)")
+
+    # Row player's wins/draws/losses against the column player, both
+    # ways round
+    print()
+    print("W/D/L of row against column, over both colours")
+    width = max(len(name) for name in names) + 2
+    cell = 24
+    print(" " * width + "".join(f"{name:>{cell}}" for name in names))
+    for a in names:
+        row = f"{a:<{width}}"
+        for b in names:
+            as_x = results[(a, b)]
+            as_o = results[(b, a)]
+            wins = as_x[0] + as_o[2]
+            draws = as_x[1] + as_o[1]
+            losses = as_x[2] + as_o[0]
+            row += f"{f'{wins}/{draws}/{losses}':>{cell}}"
+        print(row)
+
+    print()
+    print(f"{'move latency (us)':<{width + 8}}"
+          f"{'p50':>10}{'p90':>10}{'p99':>10}{'p99.9':>10}{'moves':>14}")
+    for name in names:
+        histogram = latencies[name]
+        print(f"{name:<{width + 8}}"
+              + "".join(f"{percentile(histogram, p) / 1000:>10.1f}"
+                        for p in [0.5, 0.9, 0.99, 0.999])
+              + f"{sum(histogram.values()):>14,}")
+
+
+if __name__ == "__main__":
+    main()
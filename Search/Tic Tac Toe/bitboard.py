@@ -0,0 +1,188 @@
+"""
+Tic Tac Toe Player on bitboards
+
+A state is a pair of 9-bit masks (x, o), one bit per cell numbered row
+by row, so a move is one OR and a win is one table lookup. The API is
+the same as tictactoe.py; from_board and to_board convert to and from
+its list of lists.
+"""
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# Every cell filled
+FULL = 0b111111111
+
+# Bit of each cell (i, j)
+CELLS = [((i, j), 1 << (3 * i + j)) for i in range(3) for j in range(3)]
+
+# Rows, columns and diagonals
+WIN_MASKS = [
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100
+]
+
+# Whether each of the 512 masks contains a winning line
+WINNING = bytes(
+    any(mask & line == line for line in WIN_MASKS) for mask in range(512)
+)
+
+# Minimax value of every state solved so far, kept across games
+table = {}
+
+
+def initial_state():
+    """
+    Returns starting state of the board.
+    """
+    return (0, 0)
+
+
+def from_board(board):
+    """
+    Returns the state of a list of lists board.
+    """
+    x = o = 0
+    for (i, j), bit in CELLS:
+        if board[i][j] == X:
+            x |= bit
+        elif board[i][j] == O:
+            o |= bit
+    return (x, o)
+
+
+def to_board(state):
+    """
+    Returns the list of lists board of a state.
+    """
+    x, o = state
+    board = [[EMPTY, EMPTY, EMPTY],
+             [EMPTY, EMPTY, EMPTY],
+             [EMPTY, EMPTY, EMPTY]]
+    for (i, j), bit in CELLS:
+        if x & bit:
+            board[i][j] = X
+        elif o & bit:
+            board[i][j] = O
+    return board
+
+
+def player(state):
+    """
+    Returns player who has the next turn on a board.
+    """
+    x, o = state
+    return X if x.bit_count() == o.bit_count() else O
+
+
+def actions(state):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    taken = state[0] | state[1]
+    return {action for action, bit in CELLS if not taken & bit}
+
+
+def result(state, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    i, j = action
+    if not (0 <= i < 3 and 0 <= j < 3):
+        raise Exception("Not valid move")
+    bit = 1 << (3 * i + j)
+    x, o = state
+    if (x | o) & bit:
+        raise Exception("Not valid move")
+    if x.bit_count() == o.bit_count():
+        return (x | bit, o)
+    return (x, o | bit)
+
+
+def winner(state):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    x, o = state
+    if WINNING[x]:
+        return X
+    if WINNING[o]:
+        return O
+    return None
+
+
+def terminal(state):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    x, o = state
+    return bool(WINNING[x] or WINNING[o]) or x | o == FULL
+
+
+def utility(state):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    x, o = state
+    if WINNING[x]:
+        return 1
+    if WINNING[o]:
+        return -1
+    return 0
+
+
+def value(x, o):
+    """
+    Returns the minimax value of a state: 1 if X wins with best play,
+    -1 if O does, 0 for a tie.
+    """
+    key = (x, o)
+    if key in table:
+        return table[key]
+    if WINNING[x]:
+        v = 1
+    elif WINNING[o]:
+        v = -1
+    elif x | o == FULL:
+        v = 0
+    elif x.bit_count() == o.bit_count():
+        v = -1
+        for _, bit in CELLS:
+            if not (x | o) & bit:
+                v = max(v, value(x | bit, o))
+                # Stops searching if finds the absolute maximum
+                if v == 1:
+                    break
+    else:
+        v = 1
+        for _, bit in CELLS:
+            if not (x | o) & bit:
+                v = min(v, value(x, o | bit))
+                # Stops searching if finds the absolute minimum
+                if v == -1:
+                    break
+    table[key] = v
+    return v
+
+
+def minimax(state):
+    """
+    Returns the optimal action for the current player on the board.
+    """
+    if terminal(state):
+        return None
+    x, o = state
+    moves = [(action, bit) for action, bit in CELLS if not (x | o) & bit]
+    if x.bit_count() == o.bit_count():
+        return max(moves, key=lambda move: value(x | move[1], o))[0]
+    return min(moves, key=lambda move: value(x, o | move[1]))[0]
+
+
+def board_minimax(board):
+    """
+    Returns the optimal action on a list of lists board, so callers
+    that keep boards in that form can use this engine.
+    """
+    return minimax(from_board(board))
@@ -0,0 +1,171 @@
+"""
+Perfect-play opening book for Tic Tac Toe
+
+Every board has an index: its cells read row by row as a base-3 number,
+with empty 0, X 1 and O 2. The book is one byte per index, 3^9 = 19,683
+bytes, holding the minimax value and best move of every reachable board,
+so looking a board up costs nine multiplications and one byte read.
+
+    python book.py           builds the book next to this file
+    python book.py --verify  checks it against the live minimax solver
+"""
+
+import os
+import sys
+import time
+
+import bitboard
+
+FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        "tictactoe.book")
+
+# Number of boards that have an index, reachable or not
+SIZE = 3 ** 9
+
+# Byte of a board that play can never reach
+UNREACHABLE = 0xFF
+
+# Move nibble of a finished game
+NO_MOVE = 0xF
+
+
+def index(board):
+    """Returns the base-3 index of a list of lists board."""
+    i = 0
+    for row in board:
+        for cell in row:
+            i = 3 * i + (1 if cell == bitboard.X else
+                         2 if cell == bitboard.O else 0)
+    return i
+
+
+def encode(value, action):
+    """
+    Packs a value (-1, 0 or 1) into the high nibble of a byte and a move
+    (cell 0-8, or none) into the low nibble.
+    """
+    move = NO_MOVE if action is None else 3 * action[0] + action[1]
+    return (value + 1) << 4 | move
+
+
+def decode(entry):
+    """Returns the (action, value) packed in a byte."""
+    move = entry & 0xF
+    action = None if move == NO_MOVE else divmod(move, 3)
+    return action, (entry >> 4) - 1
+
+
+def reachable():
+    """Yields every board reachable from the empty board, once each."""
+    seen = set()
+    stack = [bitboard.initial_state()]
+    while stack:
+        state = stack.pop()
+        if state in seen:
+            continue
+        seen.add(state)
+        yield bitboard.to_board(state)
+        if not bitboard.terminal(state):
+            for action in bitboard.actions(state):
+                stack.append(bitboard.result(state, action))
+
+
+def build():
+    """Solves every reachable board and returns the book as bytes."""
+    book = bytearray([UNREACHABLE]) * SIZE
+    for board in reachable():
+        state = bitboard.from_board(board)
+        book[index(board)] = encode(bitboard.value(*state),
+                                    bitboard.minimax(state))
+    return bytes(book)
+
+
+def save(book, path=FILENAME):
+    """Writes a book to disk, replacing any older one in one step."""
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(book)
+    os.replace(temporary, path)
+
+
+def load(path=FILENAME):
+    """Returns the book on disk, or None if there is no valid book."""
+    try:
+        with open(path, "rb") as f:
+            book = f.read()
+    except OSError:
+        return None
+    return book if len(book) == SIZE else None
+
+
+def lookup(book, board):
+    """
+    Returns the (action, value) stored for a board, or None if the board
+    is not in the book.
+    """
+    entry = book[index(board)]
+    if entry == UNREACHABLE:
+        return None
+    return decode(entry)
+
+
+def verify(book):
+    """
+    Checks every reachable board against the live solver in tictactoe.py:
+    the stored value must be the minimax value and the stored move must
+    achieve it. Returns the number of boards checked and the mismatches.
+    """
+    import tictactoe as ttt
+
+    checked = 0
+    mismatches = []
+    for board in reachable():
+        checked += 1
+        entry = lookup(book, board)
+        if ttt.player(board) == ttt.X:
+            best, reply = ttt.max_value, ttt.min_value
+        else:
+            best, reply = ttt.min_value, ttt.max_value
+        if entry is None:
+            mismatches.append(board)
+            continue
+        action, value = entry
+        if ttt.terminal(board):
+            ok = action is None and value == ttt.utility(board)
+        else:
+            ok = (value == best(board)
+                  and action in ttt.actions(board)
+                  and reply(ttt.result(board, action)) == value)
+        if not ok:
+            mismatches.append(board)
+    return checked, mismatches
+
+
+def main():
+    if len(sys.argv) > 2 or sys.argv[1:] not in [[], ["--verify"]]:
+        sys.exit("Usage: python book.py [--verify]")
+
+    if sys.argv[1:] == ["--verify"]:
+        book = load()
+        if book is None:
+            sys.exit("No book; run python book.py first.")
+        start = time.perf_counter()
+        checked, mismatches = verify(book)
+        for board in mismatches:
+            print(f"Mismatch: {board}")
+        print(f"Checked {checked} boards in "
+              f"{time.perf_counter() - start:.2f}s, "
+              f"{len(mismatches)} mismatches.")
+        if mismatches:
+            sys.exit(1)
+        return
+
+    start = time.perf_counter()
+    book = build()
+    save(book)
+    print(f"Wrote {sum(entry != UNREACHABLE for entry in book)} boards "
+          f"to {FILENAME} in {time.perf_counter() - start:.2f}s.")
+
+
+if __name__ == "__main__":
+    main()
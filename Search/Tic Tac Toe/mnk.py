@@ -0,0 +1,524 @@
+"""
+m,n,k-game player: k in a row on an m by n board
+
+Tic Tac Toe is the 3,3,3-game; 4x4 boards, 5x5 boards and gomoku-style
+games only change m, n and k. A state is a pair of bitboards (x, o)
+with bit i * n + j for cell (i, j), and every k-cell line ("window")
+is precomputed as a mask, so wins and the heuristic are mask tests.
+
+The AI is negamax with alpha-beta pruning, a transposition table and
+move ordering (best move from the table, then history scores, then
+closeness to the centre), run by iterative deepening until a fixed
+depth or a millisecond deadline. Boards too large to search to the end
+are scored by counting the windows each player could still complete.
+
+RootSplitter searches the moves at the root in parallel, young brothers
+wait style: the first move is searched alone to set a bound, then the
+rest go to a process pool, sharing the best score found so far as the
+alpha every new root move starts from.
+"""
+
+import argparse
+import math
+import multiprocessing
+import time
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# Score of a won game; quicker wins score higher
+WIN = 1000000000
+
+# Nodes searched between checks of the clock
+CLOCK_INTERVAL = 1024
+
+# Table entry kinds: exact value, lower bound, upper bound
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class Timeout(Exception):
+    """Raised inside a search when its deadline passes."""
+
+
+class SearchReport():
+    """
+    Outcome of one search: the move chosen, its value for the player to
+    move, the deepest depth completed and how many nodes that took.
+    """
+
+    def __init__(self):
+        self.action = None
+        self.value = None
+        self.depth = 0
+        self.nodes = 0
+        self.seconds = 0.0
+        self.deadline = math.inf
+
+    @property
+    def nodes_per_second(self):
+        return self.nodes / self.seconds if self.seconds else 0.0
+
+
+class Game():
+    """
+    The m,n,k-game on an m-row, n-column board, won with k in a row.
+    Moves are only searched within `radius` cells of a stone already
+    played (all empty cells if radius is None).
+    """
+
+    def __init__(self, m=3, n=3, k=3, radius=2):
+        self.m = m
+        self.n = n
+        self.k = k
+        self.radius = radius
+        self.full = (1 << (m * n)) - 1
+
+        # Every line of k cells, and the lines through each cell
+        self.windows = []
+        for i in range(m):
+            for j in range(n):
+                for di, dj in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+                    end_i = i + (k - 1) * di
+                    end_j = j + (k - 1) * dj
+                    if 0 <= end_i < m and 0 <= end_j < n:
+                        mask = 0
+                        for step in range(k):
+                            mask |= self.bit((i + step * di, j + step * dj))
+                        self.windows.append(mask)
+        self.windows_at = [
+            [w for w in self.windows if w >> cell & 1]
+            for cell in range(m * n)
+        ]
+
+        # Cells within radius of each cell, for move generation
+        self.near = []
+        for i in range(m):
+            for j in range(n):
+                mask = 0
+                if radius is not None:
+                    for a in range(max(0, i - radius), min(m, i + radius + 1)):
+                        for b in range(max(0, j - radius),
+                                       min(n, j + radius + 1)):
+                            mask |= self.bit((a, b))
+                self.near.append(mask)
+
+        # Central cells first, to order moves nobody has scored yet
+        centre_i, centre_j = (m - 1) / 2, (n - 1) / 2
+        self.cells = sorted(
+            range(m * n),
+            key=lambda cell: (abs(cell // n - centre_i)
+                              + abs(cell % n - centre_j))
+        )
+
+        # Heuristic weight of a window holding c stones of one player
+        self.weights = [0] + [10 ** c for c in range(k - 1)] + [WIN]
+
+        # Transposition table: (x, o) -> (depth, value, kind, best cell)
+        self.table = {}
+        self.history = [0] * (m * n)
+
+    def bit(self, action):
+        """Returns the bit of cell (i, j)."""
+        i, j = action
+        return 1 << (i * self.n + j)
+
+    def initial_state(self):
+        """
+        Returns starting state of the board.
+        """
+        return (0, 0)
+
+    def player(self, state):
+        """
+        Returns player who has the next turn on a board.
+        """
+        x, o = state
+        return X if x.bit_count() == o.bit_count() else O
+
+    def actions(self, state):
+        """
+        Returns set of all possible actions (i, j) available on the board.
+        """
+        taken = state[0] | state[1]
+        return {divmod(cell, self.n) for cell in range(self.m * self.n)
+                if not taken >> cell & 1}
+
+    def result(self, state, action):
+        """
+        Returns the board that results from making move (i, j) on the board.
+        """
+        i, j = action
+        if not (0 <= i < self.m and 0 <= j < self.n):
+            raise Exception("Not valid move")
+        bit = self.bit(action)
+        x, o = state
+        if (x | o) & bit:
+            raise Exception("Not valid move")
+        if x.bit_count() == o.bit_count():
+            return (x | bit, o)
+        return (x, o | bit)
+
+    def wins(self, stones):
+        """Returns True if a bitboard holds k in a row."""
+        return any(stones & w == w for w in self.windows)
+
+    def winner(self, state):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        x, o = state
+        if self.wins(x):
+            return X
+        if self.wins(o):
+            return O
+        return None
+
+    def terminal(self, state):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        x, o = state
+        return self.winner(state) is not None or x | o == self.full
+
+    def utility(self, state):
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        """
+        return {X: 1, O: -1, None: 0}[self.winner(state)]
+
+    def evaluate(self, mine, theirs):
+        """
+        Scores a position for the player owning `mine`: windows only one
+        player has stones in count for that player, more for more stones.
+        """
+        score = 0
+        weights = self.weights
+        for w in self.windows:
+            if not mine & w:
+                if theirs & w:
+                    score -= weights[(theirs & w).bit_count()]
+            elif not theirs & w:
+                score += weights[(mine & w).bit_count()]
+        return score
+
+    def moves(self, mine, theirs, best):
+        """
+        Returns the empty cells worth searching, the table's best move
+        first and the rest by history score, then closeness to the centre.
+        """
+        taken = mine | theirs
+        if self.radius is None or not taken:
+            allowed = self.full & ~taken
+        else:
+            allowed = 0
+            for cell in range(self.m * self.n):
+                if taken >> cell & 1:
+                    allowed |= self.near[cell]
+            allowed &= ~taken
+        cells = [cell for cell in self.cells if allowed >> cell & 1]
+        cells.sort(key=lambda cell: -self.history[cell])
+        if best is not None and best in cells:
+            cells.remove(best)
+            cells.insert(0, best)
+        return cells
+
+    def negamax(self, mine, theirs, depth, alpha, beta, ply, search):
+        """
+        Returns the value of a position for the player owning `mine`,
+        whose turn it is, searched depth plies deep.
+        """
+        search.nodes += 1
+        if search.nodes % CLOCK_INTERVAL == 0:
+            if time.perf_counter() > search.deadline:
+                raise Timeout()
+
+        if (mine | theirs) == self.full:
+            return 0
+        if depth == 0:
+            return self.evaluate(mine, theirs)
+
+        # Use what an earlier search learnt about this position
+        key = (mine, theirs)
+        best = None
+        entry = self.table.get(key)
+        if entry is not None:
+            entry_depth, value, kind, best = entry
+            value = self.from_table(value, ply)
+            if entry_depth >= depth:
+                if kind == EXACT:
+                    return value
+                if kind == LOWER:
+                    alpha = max(alpha, value)
+                elif kind == UPPER:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+        original_alpha = alpha
+        value = -math.inf
+        for cell in self.moves(mine, theirs, best):
+            stones = mine | 1 << cell
+            if any(stones & w == w for w in self.windows_at[cell]):
+                score = WIN - ply
+            else:
+                score = -self.negamax(theirs, stones, depth - 1,
+                                      -beta, -alpha, ply + 1, search)
+            if score > value:
+                value = score
+                best = cell
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                self.history[cell] += depth * depth
+                break
+
+        if value <= original_alpha:
+            kind = UPPER
+        elif value >= beta:
+            kind = LOWER
+        else:
+            kind = EXACT
+        self.table[key] = (depth, self.to_table(value, ply), kind, best)
+        return value
+
+    def to_table(self, value, ply):
+        """
+        Returns a score as the table keeps it: a win or loss counted in
+        plies from the position itself rather than from the root, so it
+        holds wherever the position is met again.
+        """
+        if value > WIN - self.m * self.n:
+            return value + ply
+        if value < -WIN + self.m * self.n:
+            return value - ply
+        return value
+
+    def from_table(self, value, ply):
+        """Returns a score from the table as seen from the root."""
+        if value > WIN - self.m * self.n:
+            return value - ply
+        if value < -WIN + self.m * self.n:
+            return value + ply
+        return value
+
+    def search(self, state, deadline=1000, max_depth=None):
+        """
+        Searches a position by iterative deepening until max_depth plies
+        (every empty cell by default) or until `deadline` milliseconds
+        have passed, and returns a SearchReport for the deepest depth
+        completed. The action is None on a finished game.
+        """
+        report = SearchReport()
+        start = time.perf_counter()
+        report.deadline = start + deadline / 1000
+        if self.terminal(state):
+            return report
+
+        x, o = state
+        mine, theirs = (x, o) if self.player(state) == X else (o, x)
+        empty = (self.full & ~(x | o)).bit_count()
+        if max_depth is None or max_depth > empty:
+            max_depth = empty
+
+        for depth in range(1, max_depth + 1):
+            try:
+                value = self.negamax(mine, theirs, depth, -math.inf,
+                                     math.inf, 0, report)
+            except Timeout:
+                break
+            report.depth = depth
+            report.value = value
+            report.action = divmod(self.table[(mine, theirs)][3], self.n)
+            # Stop early once the game is solved either way
+            if abs(value) >= WIN - self.m * self.n:
+                break
+
+        # Fall back on any legal move if not even depth 1 finished
+        if report.action is None:
+            cell = self.moves(mine, theirs, None)[0]
+            report.action = divmod(cell, self.n)
+        report.seconds = time.perf_counter() - start
+        return report
+
+    def minimax(self, state, deadline=1000, max_depth=None):
+        """
+        Returns the best action found for the current player on the board.
+        """
+        if self.terminal(state):
+            return None
+        return self.search(state, deadline, max_depth).action
+
+
+# Each pool worker's own game, with its own transposition table, and the
+# best root score found so far, shared by every worker
+worker_game = None
+shared_alpha = None
+
+
+def init_worker(m, n, k, radius, alpha):
+    """Sets up a pool worker for root-split search."""
+    global worker_game, shared_alpha
+    worker_game = Game(m, n, k, radius)
+    shared_alpha = alpha
+
+
+def search_root_move(task):
+    """
+    Searches one root move in a pool worker, starting from the shared
+    alpha. Returns the cell, its score, the alpha it was searched from
+    (the score is only an upper bound if no better than that alpha) and
+    the nodes searched.
+    """
+    mine, theirs, cell, depth = task
+    game = worker_game
+    report = SearchReport()
+    stones = mine | 1 << cell
+    if any(stones & w == w for w in game.windows_at[cell]):
+        score = WIN
+        alpha = -math.inf
+    else:
+        alpha = shared_alpha.value
+        score = -game.negamax(theirs, stones, depth - 1,
+                              -math.inf, -alpha, 1, report)
+    with shared_alpha.get_lock():
+        if score > shared_alpha.value:
+            shared_alpha.value = score
+    return cell, score, alpha, report.nodes
+
+
+class RootSplitter():
+    """
+    Process pool that searches the root moves of an m,n,k-game in
+    parallel, to a fixed depth.
+    """
+
+    def __init__(self, game, processes=None):
+        self.game = game
+        self.alpha = multiprocessing.Value("d", -math.inf)
+        self.pool = multiprocessing.Pool(
+            processes, initializer=init_worker,
+            initargs=(game.m, game.n, game.k, game.radius, self.alpha)
+        )
+
+    def search(self, state, depth):
+        """
+        Returns a SearchReport for a depth-ply search of a position:
+        the eldest root move is searched here first, and its score is
+        the alpha the pool starts the younger moves from.
+        """
+        report = SearchReport()
+        start = time.perf_counter()
+        if self.game.terminal(state):
+            return report
+        x, o = state
+        mine, theirs = (x, o) if self.game.player(state) == X else (o, x)
+        cells = self.game.moves(mine, theirs, None)
+
+        # Young brothers wait for the eldest to set the bound
+        eldest = cells[0]
+        stones = mine | 1 << eldest
+        if any(stones & w == w for w in self.game.windows_at[eldest]):
+            value = WIN
+        else:
+            value = -self.game.negamax(theirs, stones, depth - 1,
+                                       -math.inf, math.inf, 1, report)
+        best = eldest
+        self.alpha.value = value
+
+        tasks = [(mine, theirs, cell, depth) for cell in cells[1:]]
+        for cell, score, alpha, nodes in self.pool.imap(search_root_move,
+                                                        tasks):
+            report.nodes += nodes
+            # A score no better than its alpha is only a bound, and the
+            # move that set that alpha is at least as good
+            if score > alpha and score > value:
+                value = score
+                best = cell
+
+        report.action = divmod(best, self.game.n)
+        report.value = value
+        report.depth = depth
+        report.seconds = time.perf_counter() - start
+        return report
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+
+def speedup(m, n, k, depth, processes):
+    """
+    Times a depth-ply search of the empty board, serial and then split
+    at the root over 1 to `processes` workers, each with a fresh
+    transposition table. Yields (workers, SearchReport), 0 workers for
+    the serial search.
+    """
+    game = Game(m, n, k)
+    state = game.initial_state()
+    report = SearchReport()
+    start = time.perf_counter()
+    report.value = game.negamax(0, 0, depth, -math.inf, math.inf, 0, report)
+    report.seconds = time.perf_counter() - start
+    report.depth = depth
+    yield 0, report
+
+    for workers in range(1, processes + 1):
+        splitter = RootSplitter(Game(m, n, k), workers)
+        try:
+            yield workers, splitter.search(state, depth)
+        finally:
+            splitter.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Self-play an m,n,k-game and report search speed."
+    )
+    parser.add_argument("-m", type=int, default=3, help="rows")
+    parser.add_argument("-n", type=int, default=3, help="columns")
+    parser.add_argument("-k", type=int, default=3, help="stones in a row")
+    parser.add_argument("--depth", type=int, default=None,
+                        help="maximum search depth in plies")
+    parser.add_argument("--deadline", type=int, default=1000, metavar="MS",
+                        help="time per move in milliseconds")
+    parser.add_argument("--speedup", type=int, metavar="N",
+                        help="instead, time a --depth search of the empty "
+                             "board on 1 to N cores against the serial search")
+    args = parser.parse_args()
+
+    if args.speedup:
+        depth = args.depth or 4
+        print(f"{'cores':<8}{'seconds':>10}{'speedup':>10}{'nodes':>12}"
+              f"{'value':>14}")
+        serial = None
+        for workers, report in speedup(args.m, args.n, args.k, depth,
+                                       args.speedup):
+            if serial is None:
+                serial = report.seconds
+            label = "serial" if workers == 0 else str(workers)
+            print(f"{label:<8}{report.seconds:>10.2f}"
+                  f"{serial / report.seconds:>10.2f}{report.nodes:>12}"
+                  f"{report.value:>14}")
+        return
+
+    game = Game(args.m, args.n, args.k)
+    state = game.initial_state()
+    while not game.terminal(state):
+        report = game.search(state, args.deadline, args.depth)
+        print(f"{game.player(state)} plays {report.action}: depth "
+              f"{report.depth}, value {report.value}, {report.nodes} nodes, "
+              f"{report.nodes_per_second:,.0f} nodes/s")
+        state = game.result(state, report.action)
+
+    x, o = state
+    for i in range(game.m):
+        print(" ".join(
+            X if x >> (i * game.n + j) & 1 else O if o >> (i * game.n + j) & 1
+            else "." for j in range(game.n)
+        ))
+    winner = game.winner(state)
+    print("Tie." if winner is None else f"{winner} wins.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,56 @@
 import pygame
 import sys
+import threading
 import time
 
+import bitboard
 import tictactoe as ttt
 
+# Computer moves come from the bitboard engine if run with --bitboard
+if "--bitboard" in sys.argv[1:]:
+    ai_move = bitboard.board_minimax
+else:
+    ai_move = ttt.minimax
+
+# Shortest time a computer move is shown as thinking, in seconds
+THINKING_DELAY = 0.5
+
+# Frames drawn per second
+FPS = 60
+
+
+class Thinker():
+    """
+    Computes the computer's move in a worker thread, so the window keeps
+    drawing while it thinks. A cancelled move is thrown away when it
+    arrives.
+    """
+
+    def __init__(self, board):
+        self.start = time.perf_counter()
+        self.move = None
+        self.cancelled = False
+        self.done = threading.Event()
+        board = [row.copy() for row in board]
+        threading.Thread(target=self.run, args=(board,), daemon=True).start()
+
+    def run(self, board):
+        move = ai_move(board)
+        if not self.cancelled:
+            self.move = move
+            self.done.set()
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def ready(self):
+        """Returns True once the move is known and shown long enough."""
+        return self.done.is_set() and self.elapsed() >= THINKING_DELAY
+
+    def cancel(self):
+        self.cancelled = True
+
+
 pygame.init()
 size = width, height = 600, 400
 
@@ -17,15 +64,21 @@ mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
 moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 
+clock = pygame.time.Clock()
+
 user = None
 board = ttt.initial_state()
-ai_turn = False
+thinker = None
 
 while True:
 
+    # Position of this frame's left click, if there was one
+    click = None
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             sys.exit()
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            click = event.pos
 
     screen.fill(black)
 
@@ -54,14 +107,10 @@ while True:
         screen.blit(playO, playORect)
 
         # Check if button is clicked
-        click, _, _ = pygame.mouse.get_pressed()
-        if click == 1:
-            mouse = pygame.mouse.get_pos()
-            if playXButton.collidepoint(mouse):
-                time.sleep(0.2)
+        if click is not None:
+            if playXButton.collidepoint(click):
                 user = ttt.X
-            elif playOButton.collidepoint(mouse):
-                time.sleep(0.2)
+            elif playOButton.collidepoint(click):
                 user = ttt.O
 
     else:
@@ -101,6 +150,8 @@ while True:
                 title = f"Game Over: {winner} wins."
         elif user == player:
             title = f"Play as {user}"
+        elif thinker is not None:
+            title = f"Computer thinking... {thinker.elapsed():.1f}s"
         else:
             title = f"Computer thinking..."
         title = largeFont.render(title, True, white)
@@ -108,39 +159,36 @@ while True:
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Start the AI move, or play it once it is ready
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+            if thinker is None:
+                thinker = Thinker(board)
+            elif thinker.ready():
+                board = ttt.result(board, thinker.move)
+                thinker = None
 
         # Check for a user move
-        click, _, _ = pygame.mouse.get_pressed()
-        if click == 1 and user == player and not game_over:
-            mouse = pygame.mouse.get_pos()
+        if click is not None and user == player and not game_over:
             for i in range(3):
                 for j in range(3):
-                    if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
+                    if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(click)):
                         board = ttt.result(board, (i, j))
 
-        if game_over:
+        # The computer's move can be abandoned while it is thinking
+        if game_over or thinker is not None:
             againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
-            again = mediumFont.render("Play Again", True, black)
+            label = "Play Again" if game_over else "Reset"
+            again = mediumFont.render(label, True, black)
             againRect = again.get_rect()
             againRect.center = againButton.center
             pygame.draw.rect(screen, white, againButton)
             screen.blit(again, againRect)
-            click, _, _ = pygame.mouse.get_pressed()
-            if click == 1:
-                mouse = pygame.mouse.get_pos()
-                if againButton.collidepoint(mouse):
-                    time.sleep(0.2)
-                    user = None
-                    board = ttt.initial_state()
-                    ai_turn = False
+            if click is not None and againButton.collidepoint(click):
+                user = None
+                board = ttt.initial_state()
+                if thinker is not None:
+                    thinker.cancel()
+                    thinker = None
 
     pygame.display.flip()
+    clock.tick(FPS)
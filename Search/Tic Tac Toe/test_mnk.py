@@ -0,0 +1,50 @@
+import math
+import random
+
+from mnk import WIN, X, Game, RootSplitter, SearchReport
+
+
+def fixed_depth_value(state, depth, ply=0):
+    """
+    Returns the value of a 4x4 k=3 position searched depth plies deep
+    with a fresh table, ply plies below the root.
+    """
+    game = Game(4, 4, 3)
+    if game.terminal(state):
+        return -(WIN - ply + 1) if game.winner(state) is not None else 0
+    x, o = state
+    mine, theirs = (x, o) if game.player(state) == X else (o, x)
+    return game.negamax(mine, theirs, depth, -math.inf, math.inf, ply,
+                        SearchReport())
+
+
+def random_positions(count, seed=0):
+    """Yields unfinished 4x4 k=3 positions a few random moves in."""
+    game = Game(4, 4, 3)
+    rng = random.Random(seed)
+    while count:
+        state = game.initial_state()
+        for _ in range(rng.randrange(1, 6)):
+            state = game.result(state, rng.choice(sorted(game.actions(state))))
+            if game.terminal(state):
+                break
+        else:
+            count -= 1
+            yield state
+
+
+def test_root_splitter_moves_match_serial_values():
+    depth = 4
+    splitter = RootSplitter(Game(4, 4, 3), 4)
+    try:
+        for state in random_positions(40):
+            expected = fixed_depth_value(state, depth)
+            report = splitter.search(state, depth)
+            assert report.value == expected
+
+            # The move chosen has to be worth the value reported
+            after = Game(4, 4, 3).result(state, report.action)
+            assert -fixed_depth_value(after, depth - 1, 1) == expected
+    finally:
+        splitter.close()
+
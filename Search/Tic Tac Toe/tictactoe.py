@@ -4,10 +4,32 @@ Tic Tac Toe Player
 
 import math
 
+import book
+
 X = "X"
 O = "O"
 EMPTY = None
 
+# The 8 rotations and reflections of the board, each listing which cell
+# (numbered 0-8 row by row) lands on each cell
+SYMMETRIES = [
+    (0, 1, 2, 3, 4, 5, 6, 7, 8),
+    (6, 3, 0, 7, 4, 1, 8, 5, 2),
+    (8, 7, 6, 5, 4, 3, 2, 1, 0),
+    (2, 5, 8, 1, 4, 7, 0, 3, 6),
+    (2, 1, 0, 5, 4, 3, 8, 7, 6),
+    (6, 7, 8, 3, 4, 5, 0, 1, 2),
+    (0, 3, 6, 1, 4, 7, 2, 5, 8),
+    (8, 5, 2, 7, 4, 1, 6, 3, 0)
+]
+
+# Transposition table: minimax value of every board solved so far, keyed
+# by canonical board, kept for the life of the process
+table = {}
+
+# Perfect-play table written by book.py, or None to always search
+opening_book = book.load()
+
 
 def initial_state():
     """
@@ -126,19 +148,34 @@ def utility(board):
         return 0
 
 
+def canonical(board):
+    """
+    Returns the same key for a board and all of its rotations and
+    reflections, which share one minimax value.
+    """
+    cells = "".join(cell or "-" for row in board for cell in row)
+    return min("".join(cells[i] for i in symmetry)
+               for symmetry in SYMMETRIES)
+
+
 def max_value(board):
     """
     Returns the maximum value possible for the given board.
     """
 
+    key = canonical(board)
+    if key in table:
+        return table[key]
     if terminal(board):
-        return utility(board)
-    v = -math.inf
-    for action in actions(board):
-        v = max(v, min_value(result(board, action)))
-        # Stops searching if finds the absolute maximum for this game
-        if v == 1:
-            break
+        v = utility(board)
+    else:
+        v = -math.inf
+        for action in actions(board):
+            v = max(v, min_value(result(board, action)))
+            # Stops searching if finds the absolute maximum for this game
+            if v == 1:
+                break
+    table[key] = v
     return v
 
 
@@ -147,14 +184,19 @@ def min_value(board):
     Returns the minimum value possible for the given board.
     """
 
+    key = canonical(board)
+    if key in table:
+        return table[key]
     if terminal(board):
-        return utility(board)
-    v = math.inf
-    for action in actions(board):
-        v = min(v, max_value(result(board, action)))
-        # Stops searching if finds the absolute minimum for this game
-        if v == -1:
-            break
+        v = utility(board)
+    else:
+        v = math.inf
+        for action in actions(board):
+            v = min(v, max_value(result(board, action)))
+            # Stops searching if finds the absolute minimum for this game
+            if v == -1:
+                break
+    table[key] = v
     return v
 
 
@@ -166,17 +208,19 @@ def minimax(board):
     if terminal(board):
         return None
 
+    # Look the move up if the opening book has this board
+    if opening_book is not None:
+        entry = book.lookup(opening_book, board)
+        if entry is not None:
+            return entry[0]
+
     # Best move for X player
-    elif player(board) == X:  
-        moves = []
-        for action in actions(board):
-            moves.append([min_value(result(board, action)), action])
-        return sorted(moves, key=lambda a: a[0])[-1][1]
+    if player(board) == X:
+        return max(actions(board),
+                   key=lambda action: min_value(result(board, action)))
 
     # Best move for O player
-    elif player(board) == O:   
-        moves = []
-        for action in actions(board):
-            moves.append([max_value(result(board, action)), action])
-        return sorted(moves, key=lambda a: a[0])[0][1]
+    elif player(board) == O:
+        return min(actions(board),
+                   key=lambda action: max_value(result(board, action)))
 